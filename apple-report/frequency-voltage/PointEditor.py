@@ -1,232 +1,171 @@
+import os
 import sys
 import json
+from collections import OrderedDict
 import numpy as np
-import matplotlib
-import matplotlib.pyplot as plt
-matplotlib.use('QtAgg')
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
-    QHBoxLayout, QTableWidget, QTableWidgetItem, QCheckBox,
+    QHBoxLayout, QTableView, QCheckBox,
     QHeaderView, QMessageBox, QLabel, QTabWidget, QTextEdit,
-    QPushButton, QGroupBox, QSizePolicy
+    QPushButton, QGroupBox, QSizePolicy, QLineEdit
 )
-from PyQt6.QtCore import Qt, QEvent
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from matplotlib.lines import Line2D
-from matplotlib.backend_bases import MouseButton
+from PyQt6.QtCore import Qt, QEvent, QAbstractTableModel, QModelIndex, QTimer, pyqtSignal
+from concurrent.futures import ThreadPoolExecutor
+from curve_store import CurveStore, COLUMNS, columns_to_group_json, write_group_json, clean_group
+from edit_history import EditHistory, HISTORY_MEMORY_BUDGET
+from instrumentation import PROFILER, TRACE_PATH_ENV, DEFAULT_TRACE_PATH, profiled
 INITIAL_DATA_GROUPS = {}
+DEFAULT_EXPORT_PATH = 'curve_groups_export.json'
+JSON_SYNC_DEBOUNCE_MS = 150
+JSON_EXECUTOR = ThreadPoolExecutor(max_workers=1)
+MAX_LOADED_GROUPS = 4
+FRAME_OVERLAY_INTERVAL_MS = 250
+FRAME_OVERLAY_PATHS = ('on_motion', 'canvas_blit', 'canvas_draw', 'update_table', 'update_from_drag',
+                       'update_plot_from_table', 'sync_json_from_data', 'json_serialize', 'history_record')
 DEFAULT_EMPTY_GROUP_DATA = {
     "Curve A": [],
     "Curve B": []
 }
-MAX_HISTORY_DEPTH = 10
-class PointEditor:
-    def __init__(self, line, update_table_callback):
-        self.line = line
-        self.canvas = line.axes.figure.canvas
-        self.update_table = update_table_callback
-        self.x = self.line.get_xdata()
-        self.y = self.line.get_ydata()
-        self._ind = None
-        self.cid_press = self.canvas.mpl_connect('button_press_event', self.on_press)
-        self.cid_release = self.canvas.mpl_connect('button_release_event', self.on_release)
-        self.cid_motion = self.canvas.mpl_connect('motion_notify_event', self.on_motion)
-    def get_ind_under_point(self, event):
-        xy = np.asarray(self.line.get_data()).T
-        xyt = self.line.axes.transData.transform(xy)
-        d = np.sqrt((xyt[:, 0] - event.x)**2 + (xyt[:, 1] - event.y)**2)
-        ind_closest = np.argmin(d)
-        return ind_closest if d[ind_closest] < 10 else None
-    def on_press(self, event):
-        if event.inaxes != self.line.axes:
-            return
-        if event.button == MouseButton.RIGHT:
-            self._ind = self.get_ind_under_point(event)
-            if self._ind is not None:
-                self.remove_point(self._ind)
-            return
-        if event.button == MouseButton.LEFT:
-            self._ind = self.get_ind_under_point(event)
-            return
-    def remove_point(self, ind):
-        self.x = np.delete(self.x, ind)
-        self.y = np.delete(self.y, ind)
-        self.line.set_data(self.x, self.y)
-        self.canvas.draw_idle()
-        self.update_table(self.line.get_label(), 'delete', ind)
-    def on_motion(self, event):
-        if self._ind is None or event.inaxes != self.line.axes or event.button != MouseButton.LEFT:
-            return
-        self.x[self._ind] = event.xdata
-        self.y[self._ind] = event.ydata
-        self.line.set_data(self.x, self.y)
-        self.canvas.draw_idle()
-        self.update_table(self.line.get_label(), 'move', self._ind, new_x=event.xdata, new_y=event.ydata)
-    def on_release(self, event):
-        self._ind = None
-class MatplotlibCanvas(FigureCanvas):
-    def __init__(self, parent=None, width=5, height=4, dpi=100):
-        fig = Figure(figsize=(width, height), dpi=dpi)
-        self.axes = fig.add_subplot(111)
-        super().__init__(fig)
-        self.setParent(parent)
-        self.axes.set_xlabel('Freq (MHz)')
-        self.axes.set_ylabel('Voltage (mV)')
-        self.axes.set_title('Interactive Curve Editor')
-        self.axes.grid(True)
-        self.lines = {}
-        self.editors = {}
-        self.colors = ['r', 'b', 'g', 'm']
-    def plot_data(self, data_storage, update_table_callback):
-        self.axes.clear()
-        self.lines = {}
-        self.editors = {}
-        self.axes.grid(True)
-        for i, (name, data) in enumerate(data_storage.items()):
-            freqs = [float(d['freq_mhz']) for d in data]
-            voltages = [float(d['voltage_mv']) for d in data]
-            line, = self.axes.plot(freqs, voltages,
-                                 marker='o', linestyle='-',
-                                 color=self.colors[i % len(self.colors)],
-                                 label=name)
-            self.lines[name] = line
-            editor = PointEditor(line, update_table_callback)
-            self.editors[name] = editor
-        self.axes.legend()
-        self.draw()
-class TableWidget(QTableWidget):
-    def __init__(self, curve_name, data, update_plot_callback, update_json_callback, save_history_callback):
+class CurveTableModel(QAbstractTableModel):
+    def __init__(self, store, edit_callback, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.edit_callback = edit_callback
+        self.store.subscribe(self.on_store_changed)
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.store)
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return None
+        column = self.store.freq_mhz if index.column() == 0 else self.store.voltage_mv
+        return str(int(column[index.row()]))
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return COLUMNS[section]
+        return super().headerData(section, orientation, role)
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemFlag.ItemIsEditable
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        return self.edit_callback(index.row(), index.column(), value)
+    def release(self):
+        self.store.unsubscribe(self.on_store_changed)
+    def on_store_changed(self, action, index, old=None):
+        if action == 'move':
+            self.dataChanged.emit(self.index(index, 0), self.index(index, len(COLUMNS) - 1))
+        elif action == 'insert':
+            self.beginInsertRows(QModelIndex(), index, index)
+            self.endInsertRows()
+        elif action == 'delete':
+            self.beginRemoveRows(QModelIndex(), index, index)
+            self.endRemoveRows()
+        else:
+            self.beginResetModel()
+            self.endResetModel()
+class TableWidget(QTableView):
+    def __init__(self, curve_name, store, update_plot_callback, update_json_callback):
         super().__init__()
         self.curve_name = curve_name
         self.update_plot = update_plot_callback
         self.update_json = update_json_callback
-        self.save_history = save_history_callback
-        self.data = data
-        self.setRowCount(len(data))
-        self.setColumnCount(2)
-        self.setHorizontalHeaderLabels(['freq_mhz', 'voltage_mv'])
+        self.store = store
+        self.table_model = CurveTableModel(store, self.on_cell_changed, self)
+        self.setModel(self.table_model)
         header = self.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.populate_table()
-        self.cellChanged.connect(self.on_cell_changed)
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+    def rowCount(self):
+        return self.table_model.rowCount()
+    def currentRow(self):
+        return self.currentIndex().row()
     def populate_table(self):
-        self.blockSignals(True)
-        self.setRowCount(len(self.data))
-        for row, item in enumerate(self.data):
-            self.setItem(row, 0, QTableWidgetItem(str(int(item['freq_mhz']))))
-            self.setItem(row, 1, QTableWidgetItem(str(int(item['voltage_mv']))))
-        self.blockSignals(False)
-    def on_cell_changed(self, row, column):
+        self.table_model.on_store_changed('reset', None)
+    def on_cell_changed(self, row, column, text):
         try:
-            if not self.item(row, column):
-                 return
-            self.save_history()
-            new_value = int(round(float(self.item(row, column).text())))
-            key = self.horizontalHeaderItem(column).text()
-            self.data[row][key] = new_value
-            self.blockSignals(True)
-            self.item(row, column).setText(str(new_value))
-            self.blockSignals(False)
-            self.update_plot(self.curve_name, self.data)
+            new_value = int(round(float(text)))
+            self.store.set_point(row, **{COLUMNS[column]: new_value})
+            self.update_plot(self.curve_name)
             self.update_json()
-        except ValueError:
+            return True
+        except (ValueError, OverflowError):
             QMessageBox.warning(self, "输入错误", "请输入有效的数字 (将自动取整)。")
-            self.populate_table()
+            return False
     def add_row(self):
         current_row = self.currentRow()
         insert_index = current_row + 1 if current_row >= 0 else self.rowCount()
         if insert_index > 0:
-            default_data = self.data[insert_index - 1].copy()
-            default_data['freq_mhz'] = int(default_data['freq_mhz']) + 10
-            default_data['voltage_mv'] = int(default_data['voltage_mv']) + 1
+            default_data = self.store.record(insert_index - 1)
+            default_data['freq_mhz'] += 10
+            default_data['voltage_mv'] += 1
         else:
             default_data = {"freq_mhz": 500, "voltage_mv": 650}
-        self.save_history()
-        self.data.insert(insert_index, default_data)
-        self.insertRow(insert_index)
-        self.setItem(insert_index, 0, QTableWidgetItem(str(default_data['freq_mhz'])))
-        self.setItem(insert_index, 1, QTableWidgetItem(str(default_data['voltage_mv'])))
-        self.update_plot(self.curve_name, self.data)
+        self.store.insert(insert_index, default_data['freq_mhz'], default_data['voltage_mv'])
+        self.update_plot(self.curve_name)
         self.update_json()
     def remove_row(self):
         current_row = self.currentRow()
         if current_row < 0:
             QMessageBox.warning(self, "操作失败", "请先在表格中选择要删除的行。")
             return
-        self.save_history()
-        del self.data[current_row]
-        self.removeRow(current_row)
-        self.update_plot(self.curve_name, self.data)
+        self.store.delete(current_row)
+        self.update_plot(self.curve_name)
         self.update_json()
+    @profiled('update_from_drag')
     def update_from_drag(self, action, index, new_x=None, new_y=None, new_data=None):
-        self.blockSignals(True)
-        self.save_history()
         if action == 'move':
-            x_int = int(round(new_x))
-            y_int = int(round(new_y))
-            self.data[index]['freq_mhz'] = x_int
-            self.data[index]['voltage_mv'] = y_int
-            self.item(index, 0).setText(str(x_int))
-            self.item(index, 1).setText(str(y_int))
+            self.store.set_point(index, int(round(new_x)), int(round(new_y)))
         elif action == 'delete':
-            del self.data[index]
-            self.removeRow(index)
-        self.blockSignals(False)
+            self.store.delete(index)
         self.update_json()
 class CurveGroupWidget(QWidget):
-    def __init__(self, group_name, initial_data, main_window):
+    json_ready = pyqtSignal(int, str)
+    def __init__(self, group_name, initial_data, main_window, history=None):
         super().__init__()
         self.group_name = group_name
-        self.data_storage = initial_data
+        self.data_storage = {name: data if isinstance(data, CurveStore) else CurveStore.from_records(data) for name, data in initial_data.items()}
         self.main_window = main_window
         self.table_widgets = {}
         self.curve_names_list = list(initial_data.keys())
-        self.history_stack = []
-        self.history_pointer = -1
-        self._save_history(initial_load=True)
+        self.history = history if history is not None else EditHistory(self.data_storage)
+        self._json_dirty = False
+        self._json_generation = 0
+        self._json_timer = QTimer(self)
+        self._json_timer.setSingleShot(True)
+        self._json_timer.setInterval(JSON_SYNC_DEBOUNCE_MS)
+        self._json_timer.timeout.connect(self._start_json_sync)
+        self._analysis_timer = QTimer(self)
+        self._analysis_timer.setSingleShot(True)
+        self._analysis_timer.setInterval(JSON_SYNC_DEBOUNCE_MS)
+        self._analysis_timer.timeout.connect(self._refresh_analysis)
+        self.json_ready.connect(self._apply_json_text)
         self.setLayout(self._create_main_layout())
-        self.canvas.plot_data(self.data_storage, self._update_table_from_drag)
+        self.canvas.plot_data(self.data_storage, self._update_table_from_drag, self.history)
+        self._sync_json_from_data()
+    def _load_state(self):
+        self.canvas.plot_data(self.data_storage, self._update_table_from_drag, self.history)
         self._sync_json_from_data()
-    def _save_history(self, initial_load=False):
-        if not initial_load:
-            if self.history_pointer < len(self.history_stack) - 1:
-                self.history_stack = self.history_stack[:self.history_pointer + 1]
-        data_copy = json.loads(json.dumps(self.data_storage))
-        self.history_stack.append(data_copy)
-        if len(self.history_stack) > MAX_HISTORY_DEPTH:
-            self.history_stack.pop(0)
-        self.history_pointer = len(self.history_stack) - 1
-    def _load_state(self, index):
-        if 0 <= index < len(self.history_stack):
-            self.history_pointer = index
-            new_state = self.history_stack[index]
-            self.data_storage = new_state
-            self.canvas.plot_data(self.data_storage, self._update_table_from_drag)
-            for name, table in self.table_widgets.items():
-                table.data = self.data_storage[name]
-                table.populate_table()
-            self._sync_json_from_data()
-            return True
-        return False
     def undo(self):
-        if self.history_pointer > 0:
-            self._load_state(self.history_pointer - 1)
+        if self.history.undo():
+            self._load_state()
         else:
             QMessageBox.information(self, "操作失败", "没有历史记录可以撤销了。")
     def redo(self):
-        if self.history_pointer < len(self.history_stack) - 1:
-            self._load_state(self.history_pointer + 1)
+        if self.history.redo():
+            self._load_state()
         else:
             QMessageBox.information(self, "操作失败", "没有历史记录可以重做了。")
     def _create_main_layout(self):
+        from curve_canvas import MatplotlibCanvas
         main_layout = QHBoxLayout()
         self.canvas = MatplotlibCanvas(self)
         main_layout.addWidget(self.canvas, 2)
         control_area = QVBoxLayout()
         main_layout.addLayout(control_area, 1)
         control_area.addWidget(self._create_visibility_controls())
-        control_area.addWidget(QLabel(f"操作提示: 撤销(Ctrl+Z), 重做(Ctrl+Y)。最大历史步数: {MAX_HISTORY_DEPTH}。"))
+        control_area.addWidget(QLabel(f"操作提示: 撤销(Ctrl+Z), 重做(Ctrl+Y), 性能面板(Ctrl+Shift+P)。历史记录内存上限: {HISTORY_MEMORY_BUDGET // (1024 * 1024)} MB。"))
         self.tabs = self._create_table_tabs()
         control_area.addWidget(self.tabs, 1)
         self._create_json_editor(control_area)
@@ -240,16 +179,22 @@ class CurveGroupWidget(QWidget):
             checkbox.stateChanged.connect(lambda state, n=name: self._toggle_visibility(n, state))
             layout.addWidget(checkbox)
         layout.addStretch(1)
+        overlay_checkbox = QCheckBox("叠加全部组对比包络")
+        overlay_checkbox.stateChanged.connect(self._toggle_comparison_overlay)
+        layout.addWidget(overlay_checkbox)
+        outlier_checkbox = QCheckBox("标记拟合异常点")
+        outlier_checkbox.stateChanged.connect(self._toggle_outliers)
+        layout.addWidget(outlier_checkbox)
         return group_box
     def _create_table_tabs(self):
         tab_widget = QTabWidget()
-        for name, data in self.data_storage.items():
+        for name, store in self.data_storage.items():
             tab_content = QWidget()
             vbox = QVBoxLayout(tab_content)
             button_layout = QHBoxLayout()
             add_button = QPushButton("➕ 添加行")
             remove_button = QPushButton("➖ 删除行 (选中行)")
-            table = TableWidget(name, data, self._update_plot_from_table, self._sync_json_from_data, self._save_history)
+            table = TableWidget(name, store, self._update_plot_from_table, self._sync_json_from_data)
             add_button.clicked.connect(table.add_row)
             remove_button.clicked.connect(table.remove_row)
             button_layout.addWidget(add_button)
@@ -279,59 +224,111 @@ class CurveGroupWidget(QWidget):
         if line:
             line.set_visible(is_visible)
             self.canvas.draw_idle()
-    def _update_plot_from_table(self, curve_name, new_data):
-        freqs = [float(d['freq_mhz']) for d in new_data]
-        voltages = [float(d['voltage_mv']) for d in new_data]
-        line = self.canvas.lines.get(curve_name)
-        if line:
-            line.set_data(freqs, voltages)
-            editor = self.canvas.editors.get(curve_name)
-            if editor:
-                editor.x = np.array(freqs)
-                editor.y = np.array(voltages)
+    def _toggle_comparison_overlay(self, state):
+        if state != 2:
+            self.canvas.clear_overlay()
+            return
+        self._refresh_comparison_overlay()
+    @profiled('compare_overlay')
+    def _refresh_comparison_overlay(self):
+        from dvfs_compare import CurveComparison, curve_family
+        dataset = self.main_window.dataset
+        core_of = dataset.core_of if dataset else (lambda group_name: None)
+        core = core_of(self.group_name)
+        peers = {name: data for name, data in self.main_window.group_data.items() if core_of(name) == core}
+        envelopes, summary = {}, []
+        for curve_name in self.curve_names_list:
+            family = curve_family(curve_name)
+            curve_names = {name for data in peers.values() for name in data if curve_family(name) == family}
+            comparison = CurveComparison.from_groups(peers, curve_names=curve_names)
+            if not comparison.labels:
+                continue
+            envelopes[curve_name] = comparison.envelope()
+            ranking = comparison.ranking()
+            own = f"{self.group_name} / {curve_name}"
+            summary.extend(f"{curve_name} 第 {rank}/{len(ranking)} ({row['mean_delta_mv']:+.1f} mV)"
+                           for rank, row in enumerate(ranking, 1) if row['label'] == own)
+        self.canvas.set_overlay(envelopes)
+        self.main_window.statusBar().showMessage(f"已与 {len(peers)} 个同类组逐曲线对比。{', '.join(summary)}", 10000)
+    def _toggle_outliers(self, state):
+        if state != 2:
+            self.canvas.clear_outliers()
+            self.main_window.statusBar().clearMessage()
+            return
+        self._refresh_outliers()
+    def _refresh_analysis(self):
+        if self.canvas.outliers is not None:
+            self._refresh_outliers()
+        if self.canvas.overlay_envelope is not None:
+            self._refresh_comparison_overlay()
+    @profiled('fit_outliers')
+    def _refresh_outliers(self):
+        from dvfs_fit import CurveFit
+        fit = CurveFit.from_groups({self.group_name: self.data_storage})
+        outliers = {curve_name: fit.outliers(row) for row, (_, curve_name) in enumerate(fit.keys)}
+        self.canvas.set_outliers(outliers)
+        summary = ", ".join(f"{curve_name}: {len(indices)}" for curve_name, indices in outliers.items())
+        self.main_window.statusBar().showMessage(f"拟合异常点 ({summary})", 10000)
+    @profiled('update_plot_from_table')
+    def _update_plot_from_table(self, curve_name):
+        if curve_name in self.canvas.lines:
             self.canvas.axes.relim()
             self.canvas.axes.autoscale_view()
             self.canvas.draw_idle()
+    @profiled('update_table')
     def _update_table_from_drag(self, curve_name, action, index, new_x=None, new_y=None, new_data=None):
         table = self.table_widgets.get(curve_name)
         if table:
             table.update_from_drag(action, index, new_x, new_y, new_data)
+    @profiled('sync_json_from_data')
     def _sync_json_from_data(self):
+        self._json_dirty = True
+        self._json_timer.start()
+        if self.canvas.outliers is not None or self.canvas.overlay_envelope is not None:
+            self._analysis_timer.start()
+    @profiled('start_json_sync')
+    def _start_json_sync(self):
+        if not self.json_editor.isVisible():
+            return
+        self._json_dirty = False
+        self._json_generation += 1
+        generation = self._json_generation
+        columns = [self.data_storage[name].snapshot() for name in self.curve_names_list]
+        future = JSON_EXECUTOR.submit(profiled('json_serialize')(columns_to_group_json), columns)
+        future.add_done_callback(lambda f: self._emit_json_ready(generation, f))
+    def _emit_json_ready(self, generation, future):
+        try:
+            self.json_ready.emit(generation, future.result())
+        except RuntimeError:
+            pass
+    def _apply_json_text(self, generation, json_output):
+        if generation != self._json_generation or self._json_dirty:
+            return
         self.json_editor.blockSignals(True)
-        output_list = []
-        for name in self.curve_names_list:
-            output_list.append(self.data_storage[name])
-        json_output = json.dumps(output_list, separators=(',', ':'))
-        self.json_editor.setText(json_output)
+        self.json_editor.setPlainText(json_output)
         self.json_editor.blockSignals(False)
+    def release(self):
+        self._json_timer.stop()
+        self._analysis_timer.stop()
+        self.canvas.release()
+        for table in self.table_widgets.values():
+            table.table_model.release()
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._json_dirty:
+            self._json_timer.start()
     def _import_from_json(self):
         try:
             raw_text = self.json_editor.toPlainText().strip()
             if not raw_text:
                 raise ValueError("JSON 文本框为空。")
             input_list = json.loads(raw_text)
-            if not isinstance(input_list, list):
-                raise ValueError("JSON 格式错误：根元素必须是列表 (例如：[[...],[...]])")
-            num_input_curves = len(input_list)
-            num_expected_curves = len(self.curve_names_list)
-            if num_input_curves != num_expected_curves:
-                raise ValueError(f"输入数组数量 ({num_input_curves}) 与图表曲线数量 ({num_expected_curves}) 不匹配。")
-            self._save_history()
-            new_data_storage = {}
-            for i, data_array in enumerate(input_list):
-                curve_name = self.curve_names_list[i]
-                cleaned_array = []
-                for d in data_array:
-                    cleaned_array.append({
-                        'freq_mhz': int(d['freq_mhz']),
-                        'voltage_mv': int(d['voltage_mv'])
-                    })
-                new_data_storage[curve_name] = cleaned_array
-            self.data_storage = new_data_storage
-            self.canvas.plot_data(self.data_storage, self._update_table_from_drag)
-            for name, table in self.table_widgets.items():
-                table.data = self.data_storage[name]
-                table.populate_table()
+            new_columns = clean_group(input_list, len(self.curve_names_list))
+            with self.history.gesture():
+                for curve_name, (freqs, voltages) in zip(self.curve_names_list, new_columns):
+                    self.data_storage[curve_name].assign(freqs, voltages)
+            self.canvas.plot_data(self.data_storage, self._update_table_from_drag, self.history)
+            self._refresh_analysis()
             QMessageBox.information(self, "导入成功", f"组 '{self.group_name}' 数据已更新。")
         except json.JSONDecodeError:
             QMessageBox.critical(self, "导入失败", "JSON 文本内容不是有效的 JSON 格式。")
@@ -339,12 +336,129 @@ class CurveGroupWidget(QWidget):
             QMessageBox.critical(self, "导入失败", f"{e}")
         except Exception as e:
             QMessageBox.critical(self, "未知错误", f"更新失败: {e}")
+class FrameTimeOverlay(QLabel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet("background: rgba(0, 0, 0, 170); color: #7CFC00; font-family: monospace; padding: 6px;")
+        self.timer = QTimer(self)
+        self.timer.setInterval(FRAME_OVERLAY_INTERVAL_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.hide()
+    def set_active(self, active):
+        if active:
+            self.timer.start()
+            self.refresh()
+            self.show()
+        else:
+            self.timer.stop()
+            self.hide()
+    def refresh(self):
+        summary = PROFILER.summary()
+        rows = []
+        for name in FRAME_OVERLAY_PATHS:
+            stats = summary.get(name)
+            if stats:
+                rows.append(f"{name:<24}last {stats['last_ms']:7.2f}  p95 {stats['p95_ms']:7.2f}  max {stats['max_ms']:8.2f} ms  n={stats['count']}")
+        self.setText("\n".join(rows) or "暂无采样数据")
+        self.adjustSize()
+        self.move(self.parentWidget().width() - self.width() - 12, 12)
+        self.raise_()
+class OverlayWindow(QWidget):
+    def __init__(self, main_window):
+        super().__init__()
+        from curve_canvas import OverlayCanvas
+        self.setWindowTitle("多组叠加视图")
+        self.main_window = main_window
+        self.curve_checkboxes = {}
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("筛选:"))
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("按哈希 / 芯片 / 设备 / 组名筛选，留空显示全部")
+        self.filter_input.textChanged.connect(self._apply_filter)
+        controls.addWidget(self.filter_input, 1)
+        self.curve_controls = QHBoxLayout()
+        controls.addLayout(self.curve_controls)
+        refresh_btn = QPushButton("🔄 刷新数据")
+        refresh_btn.clicked.connect(self.refresh)
+        controls.addWidget(refresh_btn)
+        layout.addLayout(controls)
+        self.canvas = OverlayCanvas(self)
+        layout.addWidget(self.canvas, 1)
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+        self.refresh()
+    def refresh(self):
+        group_data = self.main_window.group_data
+        keys = [(group_name, curve_name) for group_name, stores in group_data.items() for curve_name in stores]
+        self.group_names = list(group_data)
+        self.curve_names = list(dict.fromkeys(curve_name for _, curve_name in keys))
+        group_lookup = {name: i for i, name in enumerate(self.group_names)}
+        curve_lookup = {name: i for i, name in enumerate(self.curve_names)}
+        self.group_index = np.array([group_lookup[group_name] for group_name, _ in keys], dtype=np.int64)
+        self.curve_index = np.array([curve_lookup[curve_name] for _, curve_name in keys], dtype=np.int64)
+        for name in list(self.curve_checkboxes):
+            if name not in curve_lookup:
+                checkbox = self.curve_checkboxes.pop(name)
+                self.curve_controls.removeWidget(checkbox)
+                checkbox.deleteLater()
+        for name in self.curve_names:
+            if name not in self.curve_checkboxes:
+                checkbox = QCheckBox(name)
+                checkbox.setChecked(True)
+                checkbox.stateChanged.connect(self._apply_filter)
+                self.curve_controls.addWidget(checkbox)
+                self.curve_checkboxes[name] = checkbox
+        self.canvas.set_curves(keys, [group_data[group_name][curve_name] for group_name, curve_name in keys])
+        self._apply_filter()
+        self.canvas.autoscale()
+    def _apply_filter(self, *args):
+        query = self.filter_input.text().strip()
+        group_ok = np.ones(len(self.group_names), dtype=bool)
+        if query:
+            dataset = self.main_window.dataset
+            matches = set(dataset.find(query)) if dataset else set()
+            group_ok = np.array([name in matches or query.lower() in name.lower() for name in self.group_names], dtype=bool)
+        curve_ok = np.array([self.curve_checkboxes[name].isChecked() for name in self.curve_names], dtype=bool)
+        mask = group_ok[self.group_index] & curve_ok[self.curve_index]
+        self.canvas.set_mask(mask)
+        self.status_label.setText(f"显示 {int(mask.sum())}/{len(mask)} 条曲线，来自 {np.unique(self.group_index[mask]).size} 个组。")
+class GroupTab(QWidget):
+    def __init__(self, group_name, data_storage, main_window):
+        super().__init__()
+        self.group_name = group_name
+        self.data_storage = data_storage
+        self.curve_names_list = list(data_storage.keys())
+        self.history = EditHistory(data_storage)
+        self.main_window = main_window
+        self.group_widget = None
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+    def load(self):
+        if self.group_widget is None:
+            self.group_widget = CurveGroupWidget(self.group_name, self.data_storage, self.main_window, self.history)
+            self.layout().addWidget(self.group_widget)
+        return self.group_widget
+    def unload(self):
+        if self.group_widget is not None:
+            self.group_widget.release()
+            self.layout().removeWidget(self.group_widget)
+            self.group_widget.deleteLater()
+            self.group_widget = None
 class MainWindow(QMainWindow):
-    def __init__(self, initial_data_groups):
+    def __init__(self, initial_data_groups, export_path=DEFAULT_EXPORT_PATH, dataset=None, session=None):
         super().__init__()
         self.setWindowTitle("多组曲线编辑器")
+        self.export_path = export_path
+        self.dataset = dataset
+        self.session = None
+        self._last_query = None
+        self._match_cursor = 0
         self.group_data = {}
         self.group_widgets = {}
+        self.loaded_groups = OrderedDict()
+        self.overlay_window = None
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         main_layout = QVBoxLayout(central_widget)
@@ -352,19 +466,35 @@ class MainWindow(QMainWindow):
         self.group_tabs = QTabWidget()
         self.group_tabs.setTabsClosable(True)
         self.group_tabs.tabCloseRequested.connect(self.remove_group)
+        self.group_tabs.currentChanged.connect(self._activate_group_tab)
         main_layout.addWidget(self.group_tabs, 1)
+        restored = session is not None and bool(session.groups)
+        if restored:
+            initial_data_groups = session.groups
         if not initial_data_groups:
              self._create_and_add_group_tab("Group 1", DEFAULT_EMPTY_GROUP_DATA.copy())
         else:
              for name, data in initial_data_groups.items():
-                self._create_and_add_group_tab(name, data)
+                self._create_and_add_group_tab(name, data, activate=False)
+        if session is not None:
+            for name, data_storage in self.group_data.items():
+                session.attach(name, data_storage, record=False)
+            if not restored:
+                session.compact()
+            self.session = session
+        self.frame_overlay = FrameTimeOverlay(central_widget)
+        self.frame_overlay.set_active(PROFILER.enabled)
         QApplication.instance().installEventFilter(self)
         self.show()
     def eventFilter(self, source, event):
         if event.type() == QEvent.Type.KeyPress:
             is_ctrl_or_cmd = event.modifiers() & (Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.MetaModifier)
             is_shift = event.modifiers() & Qt.KeyboardModifier.ShiftModifier
-            current_widget = self.group_tabs.currentWidget()
+            if is_ctrl_or_cmd and is_shift and event.key() == Qt.Key.Key_P:
+                self.toggle_profiling()
+                return True
+            current_tab = self.group_tabs.currentWidget()
+            current_widget = current_tab.group_widget if current_tab else None
             if not current_widget:
                 return super().eventFilter(source, event)
             if is_ctrl_or_cmd and event.key() == Qt.Key.Key_Z:
@@ -377,6 +507,9 @@ class MainWindow(QMainWindow):
                 current_widget.redo()
                 return True
         return super().eventFilter(source, event)
+    def toggle_profiling(self):
+        PROFILER.enabled = not PROFILER.enabled
+        self.frame_overlay.set_active(PROFILER.enabled)
     def _create_group_controls(self):
         control_bar = QHBoxLayout()
         control_bar.addWidget(QLabel("曲线组操作:"))
@@ -386,23 +519,75 @@ class MainWindow(QMainWindow):
         remove_btn = QPushButton("➖ 删除当前组")
         remove_btn.clicked.connect(lambda: self.remove_group(self.group_tabs.currentIndex()))
         control_bar.addWidget(remove_btn)
+        overlay_btn = QPushButton("📈 多组叠加视图")
+        overlay_btn.clicked.connect(self.open_overlay_window)
+        control_bar.addWidget(overlay_btn)
         control_bar.addStretch(1)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("按哈希 / 芯片 / 设备 / 组名查找，回车打开")
+        self.search_input.returnPressed.connect(self._find_group)
+        control_bar.addWidget(self.search_input)
         return control_bar
+    def open_overlay_window(self):
+        if self.overlay_window is None:
+            self.overlay_window = OverlayWindow(self)
+            self.overlay_window.resize(1200, 800)
+        else:
+            self.overlay_window.refresh()
+        self.overlay_window.show()
+        self.overlay_window.raise_()
+        return self.overlay_window
+    def open_group(self, name):
+        group_tab = self.group_widgets.get(name)
+        if group_tab is None:
+            return False
+        self.group_tabs.setCurrentWidget(group_tab)
+        return True
+    def _find_group(self):
+        query = self.search_input.text().strip()
+        if not query:
+            return
+        matches = self.dataset.find(query) if self.dataset else [query]
+        matches = [name for name in matches if name in self.group_widgets]
+        if not matches:
+            QMessageBox.information(self, "未找到", f"没有与 '{query}' 匹配的曲线组。")
+            return
+        if query == self._last_query:
+            self._match_cursor = (self._match_cursor + 1) % len(matches)
+        else:
+            self._last_query, self._match_cursor = query, 0
+        self.open_group(matches[self._match_cursor])
+        self.statusBar().showMessage(f"匹配 {self._match_cursor + 1}/{len(matches)}: {matches[self._match_cursor]}", 8000)
     def _generate_new_group_name(self):
         base = "Group "
         i = 1
         while f"{base}{i}" in self.group_data:
             i += 1
         return f"{base}{i}"
-    def _create_and_add_group_tab(self, name, data):
+    def _create_and_add_group_tab(self, name, data, activate=True):
         if name in self.group_data:
             QMessageBox.warning(self, "错误", f"组名 '{name}' 已存在。")
             return
-        group_widget = CurveGroupWidget(name, data, self)
-        self.group_data[name] = data
-        self.group_widgets[name] = group_widget
-        index = self.group_tabs.addTab(group_widget, name)
-        self.group_tabs.setCurrentIndex(index)
+        data_storage = {curve_name: records if isinstance(records, CurveStore) else CurveStore.from_records(records)
+                        for curve_name, records in data.items()}
+        group_tab = GroupTab(name, data_storage, self)
+        if self.session is not None:
+            self.session.attach(name, data_storage)
+        self.group_data[name] = data_storage
+        self.group_widgets[name] = group_tab
+        index = self.group_tabs.addTab(group_tab, name)
+        if activate:
+            self.group_tabs.setCurrentIndex(index)
+    def _activate_group_tab(self, index):
+        group_tab = self.group_tabs.widget(index)
+        if group_tab is None:
+            return
+        group_tab.load()
+        self.loaded_groups[group_tab.group_name] = group_tab
+        self.loaded_groups.move_to_end(group_tab.group_name)
+        while len(self.loaded_groups) > MAX_LOADED_GROUPS:
+            _, evicted = self.loaded_groups.popitem(last=False)
+            evicted.unload()
     def remove_group(self, index):
         if self.group_tabs.count() <= 1:
             QMessageBox.warning(self, "操作失败", "至少需要保留一个曲线组。")
@@ -416,22 +601,62 @@ class MainWindow(QMainWindow):
             self.group_tabs.removeTab(index)
             del self.group_data[group_name]
             del self.group_widgets[group_name]
+            self.loaded_groups.pop(group_name, None)
+            if self.session is not None:
+                self.session.detach(group_name)
+            widget.unload()
             widget.deleteLater()
+    def export_groups(self, path):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for i in range(self.group_tabs.count()):
+                widget = self.group_tabs.widget(i)
+                if i:
+                    f.write(',')
+                f.write('{"group_name":%s,"data":' % json.dumps(widget.group_name))
+                write_group_json(f, (widget.data_storage[curve_name] for curve_name in widget.curve_names_list))
+                f.write('}')
+            f.write(']')
+        os.replace(temp_path, path)
     def closeEvent(self, event):
-        final_output = []
-        for i in range(self.group_tabs.count()):
-            widget = self.group_tabs.widget(i)
-            group_data_list = []
-            for curve_name in widget.curve_names_list:
-                group_data_list.append(widget.data_storage[curve_name])
-            final_output.append({
-                "group_name": widget.group_name,
-                "data": group_data_list
-            })
-        final_json = json.dumps(final_output, separators=(',', ':'))
-        plt.close('all')
+        if self.overlay_window is not None:
+            self.overlay_window.close()
+        try:
+            self.export_groups(self.export_path)
+        except OSError as e:
+            QMessageBox.warning(self, "导出失败", f"无法写入 {self.export_path}: {e}")
+        if self.session is not None:
+            try:
+                self.session.compact()
+            except OSError as e:
+                QMessageBox.warning(self, "保存失败", f"无法写入会话 {self.session.path}: {e}")
+            self.session.close()
+        if PROFILER.stats:
+            trace_path = os.environ.get(TRACE_PATH_ENV, DEFAULT_TRACE_PATH)
+            try:
+                PROFILER.export(trace_path)
+            except OSError as e:
+                QMessageBox.warning(self, "导出失败", f"无法写入性能记录 {trace_path}: {e}")
         event.accept()
 if __name__ == '__main__':
+    import argparse
     app = QApplication(sys.argv)
-    window = MainWindow(INITIAL_DATA_GROUPS)
+    parser = argparse.ArgumentParser(description="多组曲线编辑器")
+    parser.add_argument('dataset', nargs='?', help="DVFS 图表数据文件 (JSON)")
+    parser.add_argument('--session', help="二进制会话文件；编辑实时追加到日志，重新打开时自动恢复")
+    args, _ = parser.parse_known_args(app.arguments()[1:])
+    dataset = None
+    session = None
+    initial_data_groups = INITIAL_DATA_GROUPS
+    if args.dataset:
+        from dvfs_dataset import DvfsDataset
+        dataset = DvfsDataset.load(args.dataset)
+        initial_data_groups = dataset.groups
+    if args.session:
+        from curve_session import CurveSession
+        session = CurveSession.open(args.session)
+    window = MainWindow(initial_data_groups, dataset=dataset, session=session)
+    if dataset and dataset.errors:
+        window.statusBar().showMessage(f"已跳过 {len(dataset.errors)} 个无法解析的数据系列。", 10000)
     sys.exit(app.exec())
@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+import numpy as np
+from PyQt6.QtWidgets import QApplication, QMessageBox
+from PyQt6.QtCore import QT_VERSION_STR
+SIZES = (10, 100, 1000, 10000, 100000)
+GROUP_COUNTS = (1, 10, 100)
+DRAG_STEPS = 50
+DRAG_OFFSETS_PX = (-5, -4, -3, -2, -1, 1, 2, 3, 4, 5)
+REPEAT = 20
+STARTUP_REPEAT = 5
+def synthetic_curve(n, seed=0):
+    rng = np.random.default_rng(seed)
+    freqs = 300 + np.arange(n) * 2
+    voltages = 550 + np.sqrt(np.arange(n)) * 4 + rng.integers(0, 3, n)
+    return [{'freq_mhz': int(f), 'voltage_mv': int(v)} for f, v in zip(freqs, voltages)]
+def synthetic_group(n, curves=2):
+    return {f"Curve {chr(65 + c)}": synthetic_curve(n, seed=c) for c in range(curves)}
+def summarize(samples):
+    samples = np.asarray(samples) * 1000
+    return {'median_ms': float(np.median(samples)), 'p95_ms': float(np.percentile(samples, 95)), 'min_ms': float(samples.min())}
+def timed(function, repeat=REPEAT):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples)
+def traced(function):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        function()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'retained_bytes': max(current - before, 0), 'peak_bytes': max(peak - before, 0)}
+class Bench:
+    def __init__(self, app, export_dir):
+        import PointEditor
+        self.app = app
+        self.editor_module = PointEditor
+        self.export_dir = export_dir
+        PointEditor.QMessageBox = type('QuietMessageBox', (QMessageBox,), {
+            'information': staticmethod(lambda *args: None),
+            'warning': staticmethod(lambda *args: None),
+            'critical': staticmethod(lambda *args: print(*args[1:], file=sys.stderr)),
+        })
+    def open_window(self, groups):
+        window = self.editor_module.MainWindow(groups, export_path=os.path.join(self.export_dir, 'export.json'))
+        window.resize(1280, 800)
+        self.app.processEvents()
+        return window
+    def close_window(self, window):
+        window.close()
+        window.deleteLater()
+        self.app.processEvents()
+    def mouse_event(self, canvas, name, freq, voltage):
+        return self.pixel_event(canvas, name, *canvas.axes.transData.transform((freq, voltage)))
+    def pixel_event(self, canvas, name, x, y):
+        from matplotlib.backend_bases import MouseEvent, MouseButton
+        return MouseEvent(name, canvas, x, y, button=MouseButton.LEFT)
+    def zoom_to_point(self, canvas, store, index, span_points=20):
+        freqs = store.freq_mhz
+        lo = freqs[max(index - span_points // 2, 0)]
+        hi = freqs[min(index + span_points // 2, len(freqs) - 1)]
+        canvas.axes.set_xlim(lo, hi)
+        canvas.draw()
+    def drag_gesture(self, canvas, store, index, samples):
+        x, y = canvas.axes.transData.transform(store.point(index))
+        changes = []
+        callback = store.subscribe(lambda action, changed, old: changes.append(changed))
+        canvas.callbacks.process('button_press_event', self.pixel_event(canvas, 'button_press_event', x, y))
+        for step in range(DRAG_STEPS):
+            event = self.pixel_event(canvas, 'motion_notify_event', x, y + DRAG_OFFSETS_PX[step % len(DRAG_OFFSETS_PX)])
+            t0 = time.perf_counter()
+            canvas.callbacks.process('motion_notify_event', event)
+            self.app.processEvents()
+            samples.append(time.perf_counter() - t0)
+        canvas.callbacks.process('button_release_event', self.pixel_event(canvas, 'button_release_event', x, y))
+        store.unsubscribe(callback)
+        if changes != [index] * DRAG_STEPS:
+            raise RuntimeError(f"拖动基准无效：{DRAG_STEPS} 次移动中只有 {changes.count(index)} 次修改了目标点。")
+    def bench_drag(self, n):
+        window = self.open_window({'bench': synthetic_group(n)})
+        group = window.group_tabs.currentWidget().group_widget
+        canvas, store = group.canvas, group.data_storage['Curve A']
+        index = n // 2
+        self.zoom_to_point(canvas, store, index)
+        samples = []
+        self.drag_gesture(canvas, store, index, samples)
+        result = summarize(samples)
+        result.update(traced(lambda: self.drag_gesture(canvas, store, index, [])))
+        self.close_window(window)
+        return result
+    def bench_pick(self, n):
+        window = self.open_window({'bench': synthetic_group(n)})
+        group = window.group_tabs.currentWidget().group_widget
+        canvas, store = group.canvas, group.data_storage['Curve A']
+        index = n // 2
+        self.zoom_to_point(canvas, store, index)
+        event = self.mouse_event(canvas, 'button_press_event', *store.point(index))
+        def cold():
+            canvas.picker.invalidate()
+            canvas.picker.get_ind_under_point(event)
+        result = {'cold': timed(cold), 'warm': timed(lambda: canvas.picker.get_ind_under_point(event))}
+        self.close_window(window)
+        return result
+    def bench_table(self, n):
+        window = self.open_window({'bench': synthetic_group(n)})
+        group = window.group_tabs.currentWidget().group_widget
+        table = group.table_widgets['Curve A']
+        result = timed(table.populate_table)
+        self.close_window(window)
+        return result
+    def bench_import(self, n):
+        group_data = synthetic_group(n)
+        window = self.open_window({'bench': synthetic_group(1)})
+        group = window.group_tabs.currentWidget().group_widget
+        group.json_editor.setPlainText(json.dumps(list(group_data.values()), separators=(',', ':')))
+        result = timed(group._import_from_json, repeat=3)
+        result['points_per_s'] = 2 * n / (result['median_ms'] / 1000)
+        result.update(traced(group._import_from_json))
+        self.close_window(window)
+        return result
+    def bench_startup(self, count):
+        groups = {f"Group {i}": synthetic_group(100) for i in range(count)}
+        samples = []
+        for _ in range(STARTUP_REPEAT):
+            t0 = time.perf_counter()
+            window = self.open_window(groups)
+            samples.append(time.perf_counter() - t0)
+            self.close_window(window)
+        return summarize(samples)
+def run(sizes=SIZES, group_counts=GROUP_COUNTS):
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as export_dir:
+        bench = Bench(app, export_dir)
+        results = {'startup': {str(count): bench.bench_startup(count) for count in group_counts}}
+        for name, function in (('drag', bench.bench_drag), ('pick', bench.bench_pick),
+                               ('populate_table', bench.bench_table), ('import', bench.bench_import)):
+            results[name] = {}
+            for n in sizes:
+                results[name][str(n)] = function(n)
+                print(f"{name} n={n}: {json.dumps(results[name][str(n)])}", file=sys.stderr)
+    import matplotlib
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'platform': platform.platform(), 'numpy': np.__version__, 'matplotlib': matplotlib.__version__,
+            'qt': QT_VERSION_STR, 'qpa': os.environ.get('QT_QPA_PLATFORM')
+        },
+        'results': results
+    }
+def flatten(results, prefix=''):
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + '/'))
+        else:
+            flat[path] = value
+    return flat
+def compare(current, baseline, tolerance):
+    current, baseline = flatten(current['results']), flatten(baseline['results'])
+    regressions = []
+    for key in sorted(current.keys() & baseline.keys()):
+        if not baseline[key]:
+            continue
+        ratio = current[key] / baseline[key]
+        higher_is_better = key.endswith('_per_s')
+        regressed = ratio < 1 / (1 + tolerance) if higher_is_better else ratio > 1 + tolerance
+        print(f"{'REGRESSION' if regressed else 'ok':>10}  {key:<50} {baseline[key]:>14.3f} -> {current[key]:>14.3f} ({ratio:.2f}x)")
+        if regressed:
+            regressions.append(key)
+    return regressions
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PointEditor 热点路径无界面基准测试。")
+    parser.add_argument('-o', '--output', default='bench_results.json', help="结果输出文件 (JSON)")
+    parser.add_argument('--baseline', help="用于对比的基准结果文件")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="允许的性能回退比例，默认 0.2 (20%%)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help="每条曲线的点数")
+    parser.add_argument('--groups', type=int, nargs='+', default=list(GROUP_COUNTS), help="启动测试中的组数量")
+    args = parser.parse_args(argv)
+    report = run(args.sizes, args.groups)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.tolerance):
+            return 1
+    return 0
+if __name__ == '__main__':
+    sys.exit(main())
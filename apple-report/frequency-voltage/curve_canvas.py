@@ -0,0 +1,427 @@
+import numpy as np
+import matplotlib
+matplotlib.use('QtAgg')
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+from matplotlib.backend_bases import MouseButton
+from matplotlib.collections import LineCollection
+from matplotlib import colormaps
+from instrumentation import profiled
+from dvfs_compare import curve_columns
+PICK_RADIUS_PX = 10
+LOD_MARKER_SPACING_PX = 4
+LOD_POINTS_PER_COLUMN = 2
+def lod_columns(x, x0, x1, columns):
+    return np.clip(np.floor((x - x0) / (x1 - x0) * columns), -1, columns).astype(np.int64)
+def minmax_keep(x, y, column):
+    order = np.lexsort((y, column))
+    column_sorted = column[order]
+    starts = np.flatnonzero(np.r_[True, column_sorted[1:] != column_sorted[:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    return np.unique(np.r_[order[starts], order[ends], np.argmin(x), np.argmax(x)])
+def decimate_minmax(x, y, x0, x1, columns):
+    keep = minmax_keep(x, y, lod_columns(x, x0, x1, columns))
+    return x[keep], y[keep]
+class PointEditor:
+    def __init__(self, line, store, update_table_callback, history=None):
+        self.line = line
+        self.store = store
+        self.canvas = line.axes.figure.canvas
+        self.update_table = update_table_callback
+        self.history = history
+        self.editable = True
+        self._ind = None
+        self._in_gesture = False
+    @property
+    def x(self):
+        return self.store.freq_mhz
+    @property
+    def y(self):
+        return self.store.voltage_mv
+    def on_press(self, event, ind):
+        if event.button == MouseButton.RIGHT:
+            self.remove_point(ind)
+            return
+        if event.button == MouseButton.LEFT:
+            self._ind = ind
+            self.canvas.begin_drag(self.line)
+            if self.history is not None:
+                self.history.begin_gesture()
+                self._in_gesture = True
+            return
+    def remove_point(self, ind):
+        self.update_table(self.line.get_label(), 'delete', ind)
+    @profiled('on_motion')
+    def on_motion(self, event):
+        if self._ind is None or event.inaxes != self.line.axes or event.button != MouseButton.LEFT:
+            return
+        self.update_table(self.line.get_label(), 'move', self._ind, new_x=event.xdata, new_y=event.ydata)
+    def on_release(self, event):
+        if self._ind is not None:
+            self.canvas.end_drag(self.line)
+        self._ind = None
+        if self._in_gesture:
+            self._in_gesture = False
+            self.history.end_gesture()
+class CurvePicker:
+    def __init__(self, canvas, radius=PICK_RADIUS_PX):
+        self.canvas = canvas
+        self.radius = radius
+        self.editors = []
+        self._active = None
+        self._index = None
+        self._index_key = None
+        self.cid_press = canvas.mpl_connect('button_press_event', self.on_press)
+        self.cid_release = canvas.mpl_connect('button_release_event', self.on_release)
+        self.cid_motion = canvas.mpl_connect('motion_notify_event', self.on_motion)
+    def set_editors(self, editors):
+        self.editors = list(editors)
+        self._active = None
+        self.invalidate()
+    def invalidate(self):
+        self._index = None
+    def _view_key(self):
+        axes = self.canvas.axes
+        return (tuple(axes.viewLim.bounds), tuple(axes.bbox.bounds),
+                tuple((editor.line.get_visible(), editor.editable) for editor in self.editors))
+    def _build_index(self):
+        points, owners, indices = [], [], []
+        for n, editor in enumerate(self.editors):
+            if not editor.line.get_visible() or not editor.editable or not len(editor.store):
+                continue
+            xy = np.column_stack((editor.x, editor.y)).astype(float)
+            points.append(self.canvas.axes.transData.transform(xy))
+            owners.append(np.full(len(xy), n))
+            indices.append(np.arange(len(xy)))
+        self._index_key = self._view_key()
+        if not points:
+            self._index = None
+            return
+        xy = np.concatenate(points)
+        cells = np.floor(xy / self.radius).astype(np.int64)
+        offset = cells.min(axis=0) - 1
+        cells -= offset
+        shape = cells.max(axis=0) + 2
+        keys = cells[:, 0] * shape[1] + cells[:, 1]
+        order = np.argsort(keys, kind='stable')
+        self._index = {
+            'keys': keys[order], 'xy': xy[order],
+            'owners': np.concatenate(owners)[order], 'indices': np.concatenate(indices)[order],
+            'offset': offset, 'shape': shape
+        }
+    def get_ind_under_point(self, event):
+        if self._index is None or self._index_key != self._view_key():
+            self._build_index()
+        index = self._index
+        if index is None or event.x is None or event.y is None:
+            return None
+        cx, cy = np.floor(np.array([event.x, event.y]) / self.radius).astype(np.int64) - index['offset']
+        cy_lo, cy_hi = max(cy - 1, 0), min(cy + 1, index['shape'][1] - 1)
+        if cy_lo > cy_hi:
+            return None
+        spans = []
+        for column in range(max(cx - 1, 0), min(cx + 1, index['shape'][0] - 1) + 1):
+            base = column * index['shape'][1]
+            lo = np.searchsorted(index['keys'], base + cy_lo, side='left')
+            hi = np.searchsorted(index['keys'], base + cy_hi, side='right')
+            if lo < hi:
+                spans.append(np.arange(lo, hi))
+        if not spans:
+            return None
+        candidates = np.concatenate(spans)
+        d = np.hypot(index['xy'][candidates, 0] - event.x, index['xy'][candidates, 1] - event.y)
+        best = np.argmin(d)
+        if d[best] >= self.radius:
+            return None
+        hit = candidates[best]
+        return self.editors[index['owners'][hit]], int(index['indices'][hit])
+    def on_press(self, event):
+        if event.inaxes != self.canvas.axes or event.button not in (MouseButton.LEFT, MouseButton.RIGHT):
+            return
+        hit = self.get_ind_under_point(event)
+        if hit is None:
+            return
+        editor, ind = hit
+        if event.button == MouseButton.LEFT:
+            self._active = editor
+        editor.on_press(event, ind)
+    def on_motion(self, event):
+        if self._active is not None:
+            self._active.on_motion(event)
+    def on_release(self, event):
+        if self._active is not None:
+            self._active.on_release(event)
+            self._active = None
+class MatplotlibCanvas(FigureCanvas):
+    def __init__(self, parent=None, width=5, height=4, dpi=100):
+        fig = Figure(figsize=(width, height), dpi=dpi)
+        self.axes = fig.add_subplot(111)
+        super().__init__(fig)
+        self.setParent(parent)
+        self.axes.set_xlabel('Freq (MHz)')
+        self.axes.set_ylabel('Voltage (mV)')
+        self.axes.set_title('Interactive Curve Editor')
+        self.axes.grid(True)
+        self.lines = {}
+        self.editors = {}
+        self.subscriptions = {}
+        self.colors = ['r', 'b', 'g', 'm']
+        self._drag_line = None
+        self._background = None
+        self._lod_busy = False
+        self._lod = {}
+        self._lod_view_key = None
+        self._data_extent = None
+        self.overlay_envelope = None
+        self.overlay_artists = []
+        self.outliers = None
+        self.outlier_artist = None
+        self.mpl_connect('draw_event', self._on_draw)
+        self.mpl_connect('resize_event', self.refresh_lod)
+        self.axes.callbacks.connect('xlim_changed', self.refresh_lod)
+        self.picker = CurvePicker(self)
+    @profiled('canvas_draw')
+    def draw(self):
+        super().draw()
+    def plot_data(self, data_storage, update_table_callback, history=None):
+        stale = [name for name, editor in self.editors.items() if data_storage.get(name) is not editor.store]
+        for name in stale:
+            self._remove_curve(name)
+        added = []
+        for i, (name, store) in enumerate(data_storage.items()):
+            editor = self.editors.get(name)
+            if editor is None:
+                self._add_curve(name, store, self.colors[i % len(self.colors)], update_table_callback, history)
+                added.append(name)
+            else:
+                editor.update_table = update_table_callback
+                editor.history = history
+        if stale or added:
+            self.axes.legend()
+        self.picker.set_editors(self.editors.values())
+        for name in added:
+            self._apply_lod(name)
+        if self.outliers is not None:
+            if self.outlier_artist is not None:
+                self.outlier_artist.remove()
+            self._draw_outliers()
+        extent = self._extent()
+        if stale or added or extent != self._data_extent:
+            self._data_extent = extent
+            self.axes.relim()
+            self.axes.autoscale_view()
+        self.draw_idle()
+    def _extent(self):
+        stores = [editor.store for editor in self.editors.values() if len(editor.store)]
+        if not stores:
+            return None
+        return (min(int(store.freq_mhz.min()) for store in stores), max(int(store.freq_mhz.max()) for store in stores),
+                min(int(store.voltage_mv.min()) for store in stores), max(int(store.voltage_mv.max()) for store in stores))
+    def _add_curve(self, name, store, color, update_table_callback, history):
+        line, = self.axes.plot(store.freq_mhz, store.voltage_mv,
+                               marker='o', linestyle='-', color=color, label=name)
+        self.lines[name] = line
+        self.editors[name] = PointEditor(line, store, update_table_callback, history)
+        callback = store.subscribe(lambda action, index, old, n=name: self._on_store_changed(n, action, index, old))
+        self.subscriptions[name] = (store, callback)
+    def _remove_curve(self, name):
+        store, callback = self.subscriptions.pop(name)
+        store.unsubscribe(callback)
+        line = self.lines.pop(name)
+        del self.editors[name]
+        self._lod.pop(name, None)
+        if line is self._drag_line:
+            self._drag_line = None
+            self._background = None
+        line.remove()
+    def _view(self):
+        x0, x1 = self.axes.get_xlim()
+        return min(x0, x1), max(x0, x1), max(int(self.axes.bbox.width), 1)
+    def refresh_lod(self, *args):
+        view = self._view()
+        if view == self._lod_view_key:
+            return
+        self._lod_view_key = view
+        for name in self.lines:
+            self._apply_lod(name)
+    def _apply_lod(self, curve_name):
+        if self._lod_busy:
+            return
+        self._lod_busy = True
+        try:
+            line, editor = self.lines[curve_name], self.editors[curve_name]
+            x, y = editor.x, editor.y
+            view = x0, x1, columns = self._view()
+            in_view = int(np.count_nonzero((x >= x0) & (x <= x1)))
+            editor.editable = in_view * LOD_MARKER_SPACING_PX <= columns or line is self._drag_line
+            column = keep = None
+            if not editor.editable and x1 != x0 and len(x) > LOD_POINTS_PER_COLUMN * columns:
+                column = lod_columns(x, x0, x1, columns)
+                keep = minmax_keep(x, y, column)
+                x, y = x[keep], y[keep]
+            self._lod[curve_name] = {'view': view, 'in_view': in_view, 'column': column, 'keep': keep}
+            line.set_data(x, y)
+            line.set_marker('o' if editor.editable else 'None')
+        finally:
+            self._lod_busy = False
+    def _patch_lod(self, curve_name, index, old):
+        state = self._lod.get(curve_name)
+        if state is None or state['view'] != self._view():
+            return self._apply_lod(curve_name)
+        line, editor = self.lines[curve_name], self.editors[curve_name]
+        x, y = editor.x, editor.y
+        x0, x1, columns = state['view']
+        state['in_view'] += int(x0 <= x[index] <= x1) - int(x0 <= old[0] <= x1)
+        editable = state['in_view'] * LOD_MARKER_SPACING_PX <= columns or line is self._drag_line
+        if editable != editor.editable:
+            return self._apply_lod(curve_name)
+        column, keep = state['column'], state['keep']
+        if keep is None:
+            line.set_data(x, y)
+            return
+        new_column = lod_columns(x[index:index + 1], x0, x1, columns)[0]
+        affected = np.unique([column[index], new_column])
+        column[index] = new_column
+        patched = [keep[~np.isin(column[keep], affected)], [np.argmin(x), np.argmax(x)]]
+        for value in affected:
+            members = np.flatnonzero(column == value)
+            if len(members):
+                patched.append(members[[np.argmin(y[members]), np.argmax(y[members])]])
+        keep = np.unique(np.concatenate(patched))
+        state['keep'] = keep
+        line.set_data(x[keep], y[keep])
+    def set_overlay(self, envelopes):
+        self.clear_overlay()
+        self.overlay_envelope = envelopes
+        self._draw_overlay()
+        self.draw_idle()
+    def clear_overlay(self):
+        for artist in self.overlay_artists:
+            artist.remove()
+        self.overlay_artists = []
+        self.overlay_envelope = None
+        self.draw_idle()
+    def _draw_overlay(self):
+        self.overlay_artists = []
+        for curve_name, envelope in self.overlay_envelope.items():
+            line = self.lines.get(curve_name)
+            color = line.get_color() if line is not None else '0.6'
+            band = self.axes.fill_between(envelope['grid'], envelope['min'], envelope['max'],
+                                          color=color, alpha=0.15, zorder=0, label='_nolegend_')
+            median, = self.axes.plot(envelope['grid'], envelope['median'],
+                                     color=color, linestyle='--', linewidth=1, alpha=0.6, zorder=1, label='_nolegend_')
+            self.overlay_artists.extend((band, median))
+    def set_outliers(self, outliers):
+        self.clear_outliers()
+        self.outliers = outliers
+        self._draw_outliers()
+        self.draw_idle()
+    def clear_outliers(self):
+        if self.outlier_artist is not None:
+            self.outlier_artist.remove()
+        self.outlier_artist = None
+        self.outliers = None
+        self.draw_idle()
+    def _draw_outliers(self):
+        points = []
+        for name, indices in self.outliers.items():
+            editor = self.editors.get(name)
+            if editor is not None:
+                indices = np.asarray(indices, dtype=np.int64)
+                indices = indices[indices < len(editor.x)]
+                points.append(np.column_stack((editor.x[indices], editor.y[indices])))
+        offsets = np.concatenate(points) if points else np.empty((0, 2))
+        self.outlier_artist = self.axes.scatter(offsets[:, 0], offsets[:, 1], s=180, facecolors='none',
+                                                edgecolors='orange', linewidths=2, zorder=3, label='_nolegend_')
+    def release(self):
+        for store, callback in self.subscriptions.values():
+            store.unsubscribe(callback)
+        self.subscriptions = {}
+        self.picker.set_editors([])
+        self.figure.clear()
+    def _on_store_changed(self, curve_name, action=None, index=None, old=None):
+        line = self.lines.get(curve_name)
+        editor = self.editors.get(curve_name)
+        if line and editor:
+            if action == 'move':
+                self._patch_lod(curve_name, index, old)
+            else:
+                self._apply_lod(curve_name)
+            self.picker.invalidate()
+            if line is self._drag_line and self._background is not None:
+                self._blit_drag()
+            else:
+                self.draw_idle()
+    def begin_drag(self, line):
+        self._drag_line = line
+        line.set_animated(True)
+        self.draw()
+    def end_drag(self, line):
+        if line is not self._drag_line:
+            return
+        line.set_animated(False)
+        self._drag_line = None
+        self._background = None
+        self.draw_idle()
+    def _on_draw(self, event):
+        if self._drag_line is None:
+            return
+        self._background = self.copy_from_bbox(self.figure.bbox)
+        self.axes.draw_artist(self._drag_line)
+    @profiled('canvas_blit')
+    def _blit_drag(self):
+        self.restore_region(self._background)
+        self.axes.draw_artist(self._drag_line)
+        self.blit(self.figure.bbox)
+class OverlayCanvas(FigureCanvas):
+    def __init__(self, parent=None, width=8, height=6, dpi=100):
+        fig = Figure(figsize=(width, height), dpi=dpi)
+        self.axes = fig.add_subplot(111)
+        super().__init__(fig)
+        self.setParent(parent)
+        self.axes.set_xlabel('Freq (MHz)')
+        self.axes.set_ylabel('Voltage (mV)')
+        self.axes.set_title('Multi-Group Overlay')
+        self.axes.grid(True)
+        self.keys = []
+        self.segments = []
+        self.colors = np.empty((0, 4))
+        self.mask = np.empty(0, dtype=bool)
+        self.points = np.empty((0, 2))
+        self.point_owner = np.empty(0, dtype=np.int64)
+        self.collection = LineCollection([], linewidths=1)
+        self.axes.add_collection(self.collection)
+        self.scatter = self.axes.scatter([], [], s=6, zorder=2)
+    @profiled('overlay_set_curves')
+    def set_curves(self, keys, curves):
+        self.keys = list(keys)
+        self.segments = [np.column_stack(curve_columns(curve)).astype(float).reshape(-1, 2) for curve in curves]
+        lengths = np.array([len(segment) for segment in self.segments], dtype=np.int64)
+        self.points = np.concatenate(self.segments) if self.segments else np.empty((0, 2))
+        self.point_owner = np.repeat(np.arange(len(self.segments)), lengths)
+        groups = {group_name: i for i, group_name in enumerate(dict.fromkeys(group_name for group_name, _ in self.keys))}
+        cmap = colormaps['tab20']
+        self.colors = cmap(np.array([groups[group_name] for group_name, _ in self.keys], dtype=np.int64) % cmap.N).reshape(-1, 4)
+        self.mask = np.ones(len(self.keys), dtype=bool)
+        self._apply_mask()
+        self.autoscale()
+    @profiled('overlay_set_mask')
+    def set_mask(self, mask):
+        self.mask = np.asarray(mask, dtype=bool)
+        self._apply_mask()
+        self.draw_idle()
+    def _apply_mask(self):
+        visible = np.flatnonzero(self.mask)
+        self.collection.set_segments([self.segments[i] for i in visible])
+        self.collection.set_color(self.colors[visible])
+        shown = self.mask[self.point_owner]
+        self.scatter.set_offsets(self.points[shown])
+        self.scatter.set_color(self.colors[self.point_owner[shown]])
+    def autoscale(self):
+        shown = self.points[self.mask[self.point_owner]]
+        if len(shown):
+            lo, hi = shown.min(axis=0), shown.max(axis=0)
+            pad = np.maximum((hi - lo) * 0.05, 1.0)
+            self.axes.set_xlim(lo[0] - pad[0], hi[0] + pad[0])
+            self.axes.set_ylim(lo[1] - pad[1], hi[1] + pad[1])
+        self.draw_idle()
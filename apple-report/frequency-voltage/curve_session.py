@@ -0,0 +1,196 @@
+import os
+import json
+import struct
+from collections import OrderedDict
+import numpy as np
+from curve_store import CurveStore
+SNAPSHOT_MAGIC = b'DVFSSNP2'
+SNAPSHOT_HEADER = struct.Struct('<8sQQ')
+JOURNAL_MAGIC = b'DVFSJNL1'
+JOURNAL_HEADER = struct.Struct('<8sQ')
+RECORD_HEADER = struct.Struct('<BI')
+POINT_RECORD = struct.Struct('<HHiii')
+INDEX_RECORD = struct.Struct('<HHi')
+GROUP_RECORD = struct.Struct('<H')
+OP_MOVE, OP_INSERT, OP_DELETE, OP_RESET, OP_ADD_GROUP, OP_REMOVE_GROUP = range(1, 7)
+def _align(offset, alignment=8):
+    return (offset + alignment - 1) // alignment * alignment
+def write_snapshot(path, groups, generation=0):
+    manifest, offset = [], 0
+    for group_name, stores in groups.items():
+        curves = []
+        for curve_name, store in stores.items():
+            curves.append({'name': curve_name, 'offset': offset, 'length': len(store)})
+            offset += len(store) * 8
+        manifest.append({'group_name': group_name, 'curves': curves})
+    manifest_bytes = json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    data_start = _align(SNAPSHOT_HEADER.size + len(manifest_bytes))
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, generation, len(manifest_bytes)))
+        f.write(manifest_bytes)
+        f.write(b'\0' * (data_start - SNAPSHOT_HEADER.size - len(manifest_bytes)))
+        for stores in groups.values():
+            for store in stores.values():
+                f.write(store.freq_mhz.astype('<i4').tobytes())
+                f.write(store.voltage_mv.astype('<i4').tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+def read_snapshot(path):
+    groups = OrderedDict()
+    if not os.path.exists(path) or os.path.getsize(path) < SNAPSHOT_HEADER.size:
+        return groups, 0
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+    magic, generation, manifest_len = SNAPSHOT_HEADER.unpack(mapped[:SNAPSHOT_HEADER.size].tobytes())
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} 不是有效的会话快照文件。")
+    manifest = json.loads(mapped[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + manifest_len].tobytes().decode('utf-8'))
+    data_start = _align(SNAPSHOT_HEADER.size + manifest_len)
+    for group in manifest:
+        stores = OrderedDict()
+        for curve in group['curves']:
+            start, length = data_start + curve['offset'], curve['length']
+            columns = np.frombuffer(mapped, dtype='<i4', count=2 * length, offset=start)
+            stores[curve['name']] = CurveStore(columns[:length], columns[length:])
+        groups[group['group_name']] = stores
+    del mapped
+    return groups, generation
+class CurveSession:
+    def __init__(self, path):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.groups = OrderedDict()
+        self._group_ids = {}
+        self._group_names = {}
+        self._curve_names = {}
+        self._subscriptions = {}
+        self._journal = None
+        self.generation = 0
+    @classmethod
+    def open(cls, path):
+        session = cls(path)
+        groups, session.generation = read_snapshot(path)
+        for group_name, stores in groups.items():
+            session._register(group_name, stores)
+        if session._replay_journal():
+            session._journal = open(session.journal_path, 'ab')
+        else:
+            session._start_journal()
+        return session
+    def _start_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_path, 'wb')
+        self._journal.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, self.generation))
+        self._journal.flush()
+    def _register(self, group_name, stores):
+        group_id = len(self._group_names)
+        self.groups[group_name] = stores
+        self._group_ids[group_name] = group_id
+        self._group_names[group_id] = group_name
+        self._curve_names[group_id] = list(stores.keys())
+        return group_id
+    def _replay_journal(self):
+        if not os.path.exists(self.journal_path):
+            return False
+        with open(self.journal_path, 'rb') as f:
+            journal = f.read()
+        if len(journal) < JOURNAL_HEADER.size or JOURNAL_HEADER.unpack_from(journal) != (JOURNAL_MAGIC, self.generation):
+            return False
+        position = valid_end = JOURNAL_HEADER.size
+        while position + RECORD_HEADER.size <= len(journal):
+            op, length = RECORD_HEADER.unpack_from(journal, position)
+            payload_start = position + RECORD_HEADER.size
+            if payload_start + length > len(journal):
+                break
+            try:
+                self._apply(op, memoryview(journal)[payload_start:payload_start + length])
+            except (ValueError, TypeError, IndexError, KeyError, OverflowError, struct.error):
+                break
+            position = valid_end = payload_start + length
+        if valid_end < len(journal):
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(valid_end)
+        return True
+    def _store(self, group_id, curve_id):
+        return self.groups[self._group_names[group_id]][self._curve_names[group_id][curve_id]]
+    def _apply(self, op, payload):
+        if op in (OP_MOVE, OP_INSERT):
+            group_id, curve_id, index, freq, voltage = POINT_RECORD.unpack(payload)
+            store = self._store(group_id, curve_id)
+            if op == OP_MOVE:
+                store.set_point(index, freq, voltage)
+            else:
+                store.insert(index, freq, voltage)
+        elif op in (OP_DELETE, OP_RESET):
+            group_id, curve_id, value = INDEX_RECORD.unpack_from(payload)
+            store = self._store(group_id, curve_id)
+            if op == OP_DELETE:
+                store.delete(value)
+            else:
+                columns = np.frombuffer(payload, dtype='<i4', count=2 * value, offset=INDEX_RECORD.size)
+                store.assign(columns[:value], columns[value:])
+        elif op == OP_ADD_GROUP:
+            group = json.loads(bytes(payload).decode('utf-8'))
+            self._register(group['group_name'], OrderedDict(
+                (name, CurveStore(*columns)) for name, columns in group['curves']))
+        elif op == OP_REMOVE_GROUP:
+            group_name = self._group_names[GROUP_RECORD.unpack(payload)[0]]
+            del self.groups[group_name]
+            del self._group_ids[group_name]
+    def _append(self, op, payload):
+        if self._journal is None:
+            return
+        self._journal.write(RECORD_HEADER.pack(op, len(payload)) + payload)
+        self._journal.flush()
+    def attach(self, group_name, stores, record=True):
+        if group_name not in self._group_ids:
+            self._register(group_name, stores)
+            if record:
+                curves = [[name, [store.freq_mhz.tolist(), store.voltage_mv.tolist()]] for name, store in stores.items()]
+                self._append(OP_ADD_GROUP, json.dumps({'group_name': group_name, 'curves': curves},
+                                                      ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        elif any(a is not b for a, b in zip(self.groups[group_name].values(), stores.values())):
+            raise ValueError(f"组 '{group_name}' 已绑定到其他数据。")
+        else:
+            self.groups[group_name] = stores
+        group_id = self._group_ids[group_name]
+        subscriptions = []
+        for curve_id, store in enumerate(stores.values()):
+            callback = store.subscribe(lambda action, index, old, g=group_id, c=curve_id, s=store: self._record(g, c, s, action, index))
+            subscriptions.append((store, callback))
+        self._subscriptions[group_name] = subscriptions
+    def detach(self, group_name, remove=True):
+        for store, callback in self._subscriptions.pop(group_name, []):
+            store.unsubscribe(callback)
+        if remove and group_name in self._group_ids:
+            self._append(OP_REMOVE_GROUP, GROUP_RECORD.pack(self._group_ids.pop(group_name)))
+            del self.groups[group_name]
+    def _record(self, group_id, curve_id, store, action, index):
+        if action in ('move', 'insert'):
+            self._append(OP_MOVE if action == 'move' else OP_INSERT, POINT_RECORD.pack(group_id, curve_id, index, *store.point(index)))
+        elif action == 'delete':
+            self._append(OP_DELETE, INDEX_RECORD.pack(group_id, curve_id, index))
+        else:
+            payload = INDEX_RECORD.pack(group_id, curve_id, len(store))
+            self._append(OP_RESET, payload + store.freq_mhz.astype('<i4').tobytes() + store.voltage_mv.astype('<i4').tobytes())
+    def compact(self):
+        write_snapshot(self.path, self.groups, self.generation + 1)
+        self.generation += 1
+        self._start_journal()
+        subscribed = set(self._subscriptions)
+        for group_name in subscribed:
+            self.detach(group_name, remove=False)
+        groups = self.groups
+        self.groups, self._group_ids, self._group_names, self._curve_names = OrderedDict(), {}, {}, {}
+        for group_name, stores in groups.items():
+            self._register(group_name, stores)
+            if group_name in subscribed:
+                self.attach(group_name, stores)
+    def close(self):
+        for group_name in list(self._subscriptions):
+            self.detach(group_name, remove=False)
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
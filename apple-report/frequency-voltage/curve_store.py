@@ -0,0 +1,124 @@
+import numpy as np
+COLUMNS = ('freq_mhz', 'voltage_mv')
+MIN_CAPACITY = 16
+class CurveStore:
+    def __init__(self, freq_mhz=(), voltage_mv=()):
+        self._size = 0
+        self._freq = np.empty(MIN_CAPACITY, dtype=np.int32)
+        self._volt = np.empty(MIN_CAPACITY, dtype=np.int32)
+        self._listeners = []
+        self._write(freq_mhz, voltage_mv)
+    @classmethod
+    def from_records(cls, records):
+        records = list(records)
+        return cls([int(d['freq_mhz']) for d in records], [int(d['voltage_mv']) for d in records])
+    def __len__(self):
+        return self._size
+    @property
+    def freq_mhz(self):
+        return self._freq[:self._size]
+    @property
+    def voltage_mv(self):
+        return self._volt[:self._size]
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+        return callback
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    def _notify(self, action, index, old=None):
+        for callback in list(self._listeners):
+            callback(action, index, old)
+    def _write(self, freq_mhz, voltage_mv):
+        freq_mhz = np.asarray(freq_mhz, dtype=np.int32).ravel()
+        voltage_mv = np.asarray(voltage_mv, dtype=np.int32).ravel()
+        if len(freq_mhz) != len(voltage_mv):
+            raise ValueError(f"频率与电压列长度不一致 ({len(freq_mhz)} != {len(voltage_mv)})。")
+        self._reserve(len(freq_mhz))
+        self._size = len(freq_mhz)
+        self._freq[:self._size] = freq_mhz
+        self._volt[:self._size] = voltage_mv
+    def _reserve(self, size):
+        if size <= len(self._freq):
+            return
+        capacity = max(MIN_CAPACITY, len(self._freq))
+        while capacity < size:
+            capacity *= 2
+        for name in ('_freq', '_volt'):
+            grown = np.empty(capacity, dtype=np.int32)
+            grown[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, grown)
+    def record(self, index):
+        return {'freq_mhz': int(self._freq[index]), 'voltage_mv': int(self._volt[index])}
+    def point(self, index):
+        return int(self._freq[index]), int(self._volt[index])
+    def set_point(self, index, freq_mhz=None, voltage_mv=None):
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        old = self.point(index)
+        if freq_mhz is not None:
+            self._freq[index] = int(freq_mhz)
+        if voltage_mv is not None:
+            self._volt[index] = int(voltage_mv)
+        self._notify('move', index, old)
+    def insert(self, index, freq_mhz, voltage_mv):
+        index = min(max(index, 0), self._size)
+        self._reserve(self._size + 1)
+        self._freq[index + 1:self._size + 1] = self._freq[index:self._size].copy()
+        self._volt[index + 1:self._size + 1] = self._volt[index:self._size].copy()
+        self._freq[index] = int(freq_mhz)
+        self._volt[index] = int(voltage_mv)
+        self._size += 1
+        self._notify('insert', index)
+    def delete(self, index):
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        old = self.point(index)
+        self._freq[index:self._size - 1] = self._freq[index + 1:self._size].copy()
+        self._volt[index:self._size - 1] = self._volt[index + 1:self._size].copy()
+        self._size -= 1
+        self._notify('delete', index, old)
+    def assign(self, freq_mhz, voltage_mv):
+        old = self.snapshot() if self._listeners else None
+        self._write(freq_mhz, voltage_mv)
+        self._notify('reset', None, old)
+    def snapshot(self):
+        return self.freq_mhz.copy(), self.voltage_mv.copy()
+    def copy(self):
+        return CurveStore(*self.snapshot())
+    def to_records(self):
+        return [{'freq_mhz': f, 'voltage_mv': v} for f, v in zip(self.freq_mhz.tolist(), self.voltage_mv.tolist())]
+    def to_json(self):
+        return curve_to_json(self.freq_mhz, self.voltage_mv)
+def curve_to_json(freq_mhz, voltage_mv):
+    return '[' + ','.join('{"freq_mhz":%d,"voltage_mv":%d}' % p for p in zip(freq_mhz.tolist(), voltage_mv.tolist())) + ']'
+def columns_to_group_json(columns):
+    return '[' + ','.join(curve_to_json(*curve) for curve in columns) + ']'
+def write_group_json(f, stores):
+    f.write('[')
+    for i, store in enumerate(stores):
+        if i:
+            f.write(',')
+        f.write(store.to_json())
+    f.write(']')
+def clean_curve(data_array):
+    if not isinstance(data_array, list):
+        raise ValueError("JSON 格式错误：每条曲线必须是点列表。")
+    freqs = np.empty(len(data_array), dtype=np.int32)
+    voltages = np.empty(len(data_array), dtype=np.int32)
+    for i, d in enumerate(data_array):
+        try:
+            if isinstance(d, dict):
+                freqs[i], voltages[i] = int(d['freq_mhz']), int(d['voltage_mv'])
+            else:
+                freqs[i], voltages[i] = int(d[0]), int(d[1])
+        except (ValueError, OverflowError, KeyError, IndexError, TypeError):
+            raise ValueError(f"第 {i + 1} 个点格式错误：需要 freq_mhz 与 voltage_mv 字段。")
+    return freqs, voltages
+def clean_group(input_list, num_expected_curves):
+    if not isinstance(input_list, list):
+        raise ValueError("JSON 格式错误：根元素必须是列表 (例如：[[...],[...]])")
+    num_input_curves = len(input_list)
+    if num_input_curves != num_expected_curves:
+        raise ValueError(f"输入数组数量 ({num_input_curves}) 与图表曲线数量 ({num_expected_curves}) 不匹配。")
+    return [clean_curve(data_array) for data_array in input_list]
@@ -0,0 +1,108 @@
+import sys
+import json
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from curve_store import clean_curve, clean_group
+CORE_KEYS = ('p_core', 'm_core', 'e_core', 'gpu', 'ane')
+SEGMENT_KEYS = ('logic_data', 'sram_data')
+def is_forked(segment_data):
+    return bool(segment_data) and isinstance(segment_data[0], list) and bool(segment_data[0]) and isinstance(segment_data[0][0], list)
+def split_forks(segment_data):
+    if not segment_data:
+        return []
+    return [fork for fork in segment_data if fork] if is_forked(segment_data) else [segment_data]
+def normalize_curve(freqs, voltages):
+    issues = []
+    order = np.lexsort((-voltages.astype(np.int64), freqs))
+    freqs, voltages = freqs[order], voltages[order]
+    keep = np.ones(len(freqs), dtype=bool)
+    keep[1:] = freqs[1:] != freqs[:-1]
+    if not keep.all():
+        issues.append(f"去除了 {int((~keep).sum())} 个重复频率点 (保留最高电压)。")
+    freqs, voltages = freqs[keep], voltages[keep]
+    drops = np.flatnonzero(np.diff(voltages) < 0)
+    if len(drops):
+        issues.append("电压非单调: " + ", ".join(f"{freqs[i + 1]} MHz ({voltages[i]} -> {voltages[i + 1]} mV)" for i in drops[:8].tolist()))
+    return freqs, voltages, issues
+def normalize_segment(segment_data):
+    forks, issues = [], []
+    parts = split_forks(segment_data)
+    for n, fork in enumerate(parts):
+        freqs, voltages, fork_issues = normalize_curve(*clean_curve(fork))
+        forks.append(np.column_stack((freqs, voltages)).tolist())
+        prefix = f"分支 {n + 1}: " if len(parts) > 1 else ""
+        issues.extend(prefix + issue for issue in fork_issues)
+    if is_forked(segment_data):
+        return forks, issues
+    return (forks[0] if forks else []), issues
+def normalize_series(task):
+    source, core, series = task
+    result = {key: value for key, value in series.items() if key not in SEGMENT_KEYS}
+    result.update({'source': source, 'core': core, 'issues': []})
+    try:
+        for key in SEGMENT_KEYS:
+            result[key], issues = normalize_segment(series.get(key) or [])
+            result['issues'].extend(f"{key}: {issue}" for issue in issues)
+    except ValueError as e:
+        result['error'] = str(e)
+    return result
+def normalize_group(task):
+    source, group, num_expected_curves = task
+    result = {'source': source, 'group_name': group.get('group_name'), 'issues': []}
+    try:
+        curves = []
+        for n, (freqs, voltages) in enumerate(clean_group(group.get('data'), num_expected_curves)):
+            freqs, voltages, issues = normalize_curve(freqs, voltages)
+            curves.append([{'freq_mhz': f, 'voltage_mv': v} for f, v in zip(freqs.tolist(), voltages.tolist())])
+            result['issues'].extend(f"曲线 {n + 1}: {issue}" for issue in issues)
+        result['data'] = curves
+    except ValueError as e:
+        result['error'] = str(e)
+    return result
+def iter_tasks(paths, num_expected_curves=2):
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            dataset = json.load(f)
+        if isinstance(dataset, dict):
+            for core in CORE_KEYS:
+                for series in dataset.get(core) or []:
+                    yield normalize_series, (path, core, series)
+        elif isinstance(dataset, list):
+            for group in dataset:
+                yield normalize_group, (path, group, num_expected_curves)
+        else:
+            raise ValueError(f"{path}: 无法识别的数据集格式。")
+def _run_task(job):
+    function, task = job
+    return function(task)
+def iter_results(paths, workers=None, num_expected_curves=2, chunksize=32):
+    jobs = iter_tasks(paths, num_expected_curves)
+    if workers == 1:
+        yield from map(_run_task, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_run_task, jobs, chunksize=chunksize)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量清洗并校验 DVFS 频率-电压数据集 (排序、去重、单调性检查)。")
+    parser.add_argument('paths', nargs='+', help="数据集 JSON 文件 (网站图表数据或编辑器导出格式)")
+    parser.add_argument('-o', '--output', help="结果输出文件 (JSON Lines)，默认输出到标准输出")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="进程数，默认使用全部 CPU")
+    parser.add_argument('--curves', type=int, default=2, help="编辑器导出格式中每组应有的曲线数量")
+    parser.add_argument('--strict', action='store_true', help="存在任何问题时以非零状态退出")
+    args = parser.parse_args(argv)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    total = flagged = failed = 0
+    try:
+        for result in iter_results(args.paths, args.workers, args.curves):
+            total += 1
+            flagged += bool(result['issues'])
+            failed += 'error' in result
+            out.write(json.dumps(result, ensure_ascii=False, separators=(',', ':')) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"共处理 {total} 条记录，{flagged} 条存在问题，{failed} 条无法解析。", file=sys.stderr)
+    return 1 if args.strict and (flagged or failed) else 0
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import numpy as np
+from curve_store import CurveStore, clean_curve
+from dvfs_batch import is_forked, split_forks
+GRID_POINTS = 256
+def curve_columns(curve):
+    if isinstance(curve, CurveStore):
+        return curve.freq_mhz, curve.voltage_mv
+    if isinstance(curve, tuple):
+        return np.asarray(curve[0]), np.asarray(curve[1])
+    return clean_curve(list(curve))
+def curve_family(curve_name):
+    base, _, suffix = curve_name.rpartition(' ')
+    return base if base and suffix.isdigit() else curve_name
+def expand_forks(label, curve):
+    if isinstance(curve, list) and is_forked(curve):
+        forks = split_forks(curve)
+        return [(f"{label} #{n + 1}", fork) for n, fork in enumerate(forks)] if len(forks) > 1 else [(label, forks[0])]
+    return [(label, curve)]
+def pack_curves(curves):
+    columns = [curve_columns(curve) for curve in curves]
+    lengths = np.array([len(freqs) for freqs, _ in columns], dtype=np.int64)
+    width = max(int(lengths.max()) if len(lengths) else 0, 1)
+    freqs = np.full((len(columns), width), np.inf)
+    voltages = np.full((len(columns), width), np.nan)
+    mask = np.arange(width)[None, :] < lengths[:, None]
+    if len(columns):
+        freqs[mask] = np.concatenate([f for f, _ in columns]).astype(float)
+        voltages[mask] = np.concatenate([v for _, v in columns]).astype(float)
+    order = np.argsort(freqs, axis=1, kind='stable')
+    return np.take_along_axis(freqs, order, axis=1), np.take_along_axis(voltages, order, axis=1), lengths
+def common_grid(freqs, lengths, num=GRID_POINTS, mode='union'):
+    valid = lengths > 0
+    if not valid.any():
+        return np.empty(0)
+    lows = freqs[valid, 0]
+    highs = np.take_along_axis(freqs[valid], (lengths[valid] - 1)[:, None], axis=1)[:, 0]
+    lo, hi = (lows.min(), highs.max()) if mode == 'union' else (lows.max(), highs.min())
+    if hi < lo:
+        return np.empty(0)
+    return np.linspace(lo, hi, num) if hi > lo else np.array([lo])
+def resample(freqs, voltages, lengths, grid):
+    n, width = freqs.shape
+    out = np.full((n, len(grid)), np.nan)
+    if n == 0 or len(grid) == 0:
+        return out
+    finite = np.isfinite(freqs)
+    filled = np.where(finite, freqs, 0.0)
+    base = min(freqs[finite].min() if finite.any() else 0.0, grid.min())
+    span = max(freqs[finite].max() if finite.any() else 0.0, grid.max()) - base + 1.0
+    rows = np.arange(n)[:, None]
+    shifted = np.where(finite, freqs - base, span - 0.5) + rows * span
+    queries = (grid[None, :] - base) + rows * span
+    pos = np.searchsorted(shifted.ravel(), queries.ravel(), side='right').reshape(n, -1) - rows * width
+    last = np.maximum(lengths - 1, 0)[:, None]
+    i1 = np.clip(pos, 1, np.maximum(last, 1))
+    i0 = np.minimum(i1 - 1, last)
+    i1 = np.minimum(i1, last)
+    f0, f1 = np.take_along_axis(filled, i0, axis=1), np.take_along_axis(filled, i1, axis=1)
+    v0, v1 = np.take_along_axis(voltages, i0, axis=1), np.take_along_axis(voltages, i1, axis=1)
+    gap = f1 - f0
+    t = np.divide(grid[None, :] - f0, gap, out=np.zeros_like(gap), where=gap > 0)
+    values = v0 + t * (v1 - v0)
+    lows = filled[:, :1]
+    highs = np.take_along_axis(filled, last, axis=1)
+    inside = (lengths[:, None] > 0) & (grid[None, :] >= lows) & (grid[None, :] <= highs)
+    out[inside] = values[inside]
+    return out
+class CurveComparison:
+    def __init__(self, labels, curves, grid=None, num=GRID_POINTS, mode='union'):
+        pairs = [pair for label, curve in zip(labels, curves) for pair in expand_forks(label, curve)]
+        self.labels = [label for label, _ in pairs]
+        curves = [curve for _, curve in pairs]
+        self.freqs, self.voltages, self.lengths = pack_curves(curves)
+        self.grid = np.asarray(grid, dtype=float) if grid is not None else common_grid(self.freqs, self.lengths, num, mode)
+        self.values = resample(self.freqs, self.voltages, self.lengths, self.grid)
+    @classmethod
+    def from_groups(cls, groups, curve_names=None, **kwargs):
+        labels, curves = [], []
+        for group_name, data in groups.items():
+            for curve_name, curve in data.items():
+                if curve_names is not None and curve_name not in curve_names:
+                    continue
+                if len(curve) == 0:
+                    continue
+                labels.append(f"{group_name} / {curve_name}")
+                curves.append(curve)
+        return cls(labels, curves, **kwargs)
+    def index(self, label):
+        return self.labels.index(label)
+    def deltas(self, reference):
+        row = self.index(reference) if isinstance(reference, str) else reference
+        return self.values - self.values[row]
+    def envelope(self):
+        covered = np.isfinite(self.values)
+        count = covered.sum(axis=0)
+        result = {'grid': self.grid, 'count': count}
+        for name, reducer in (('min', np.nanmin), ('max', np.nanmax), ('median', np.nanmedian)):
+            column = np.full(len(self.grid), np.nan)
+            has_data = count > 0
+            if has_data.any():
+                column[has_data] = reducer(self.values[:, has_data], axis=0)
+            result[name] = column
+        return result
+    def ranking(self):
+        median = self.envelope()['median']
+        offsets = self.values - median[None, :]
+        covered = np.isfinite(offsets)
+        coverage = covered.sum(axis=1)
+        scores = np.where(coverage > 0, np.nansum(np.where(covered, offsets, 0.0), axis=1) / np.maximum(coverage, 1), np.nan)
+        order = np.argsort(np.where(np.isfinite(scores), scores, np.inf), kind='stable')
+        return [{'label': self.labels[i], 'mean_delta_mv': float(scores[i]), 'coverage': int(coverage[i]) / max(len(self.grid), 1)} for i in order]
@@ -0,0 +1,128 @@
+import os
+import json
+from collections import OrderedDict
+from curve_store import clean_curve
+from dvfs_batch import CORE_KEYS, is_forked, split_forks
+MAP_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'upload', 'dvfs'))
+CORE_TITLES = {'p_core': 'P-Core', 'm_core': 'M-Core', 'e_core': 'E-Core', 'gpu': 'GPU', 'ane': 'ANE'}
+SEGMENT_TITLES = {'logic_data': 'Logic', 'sram_data': 'SRAM'}
+def _load_json(map_dir, file_name, default):
+    path = os.path.join(map_dir, file_name)
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+def split_devices(devices):
+    if isinstance(devices, list):
+        return [d.strip() for d in devices if isinstance(d, str) and d.strip()]
+    if isinstance(devices, str):
+        return [d.strip() for d in devices.split(',') if d.strip()]
+    return []
+def series_curves(series):
+    curves = OrderedDict()
+    for key, title in SEGMENT_TITLES.items():
+        segment_data = series.get(key) or []
+        forks = split_forks(segment_data)
+        for n, fork in enumerate(forks):
+            curve_name = f"{title} {n + 1}" if is_forked(segment_data) and len(forks) > 1 else title
+            freqs, voltages = clean_curve(fork)
+            curves[curve_name] = [{'freq_mhz': f, 'voltage_mv': v} for f, v in zip(freqs.tolist(), voltages.tolist())]
+    return curves
+class DvfsDataset:
+    def __init__(self, chart_data, device_to_chip=None, device_names=None, chip_models=None):
+        self.device_names = dict(device_names or {})
+        self.device_to_chip = {}
+        for device_id, chip in (device_to_chip or {}).items():
+            self.device_to_chip[device_id] = chip
+            if device_id in self.device_names:
+                self.device_to_chip.setdefault(self.device_names[device_id], chip)
+        self.chip_aliases = {}
+        self.model_names = {}
+        for entry in chip_models or []:
+            cpu_model = entry.get('cpuModel', '').strip()
+            if not cpu_model:
+                continue
+            self.chip_aliases.setdefault(entry['chipModel'], cpu_model)
+            names = [name.strip() for name in cpu_model.split('/') if name.strip()]
+            family = names[0].split()[0] if names else ''
+            suffix = names[-1].split(' ', 1)[1] if names and ' ' in names[-1] else ''
+            for name in names:
+                if not any(c.isdigit() for c in name):
+                    name = f"{family} {name}"
+                variants = [name, f"{name} {suffix}"] if suffix and ' ' not in name else [name]
+                for variant in variants:
+                    models = self.model_names.setdefault(variant, [])
+                    if cpu_model not in models:
+                        models.append(cpu_model)
+        self.series = []
+        self.groups = OrderedDict()
+        self.by_group = {}
+        self.by_hash = {}
+        self.by_chip = {}
+        self.by_device = {}
+        self.errors = []
+        for core in CORE_KEYS:
+            for series in chart_data.get(core) or []:
+                self._add_series(core, series)
+    @classmethod
+    def load(cls, path, map_dir=MAP_DIR):
+        with open(path, encoding='utf-8') as f:
+            chart_data = json.load(f)
+        return cls(chart_data,
+                   _load_json(map_dir, 'device_to_chip_map.json', {}),
+                   _load_json(map_dir, 'device_id_to_name_map.json', {}),
+                   _load_json(map_dir, 'chip_model_map.json', []))
+    def _add_series(self, core, series):
+        if not isinstance(series, dict):
+            self.errors.append({'core': core, 'error': "数据格式错误：每个系列必须是对象。"})
+            return
+        devices = split_devices(series.get('devices'))
+        chip = series.get('chip') or next((self.device_to_chip[d] for d in devices if d in self.device_to_chip), None) or 'Unknown'
+        chip = self.chip_aliases.get(chip, chip)
+        try:
+            curves = series_curves(series)
+        except (ValueError, KeyError, TypeError) as e:
+            self.errors.append({'core': core, 'chip': chip, 'devices': devices,
+                                'hashes': list(series.get('hashes') or []),
+                                'error': str(e) if isinstance(e, ValueError) else "数据格式错误：曲线段必须是点列表。"})
+            return
+        if not curves:
+            return
+        base_name = f"{chip} {CORE_TITLES.get(core, core)}"
+        group_name, n = base_name, 1
+        while group_name in self.groups:
+            n += 1
+            group_name = f"{base_name} #{n}"
+        entry = {'group_name': group_name, 'core': core, 'chip': chip, 'chip_key': self.canonical_chip(chip), 'devices': devices, 'hashes': list(series.get('hashes') or [])}
+        self.series.append(entry)
+        self.by_group[group_name] = entry
+        self.groups[group_name] = curves
+        for hash_value in entry['hashes']:
+            self.by_hash.setdefault(hash_value, []).append(entry)
+        self.by_chip.setdefault(entry['chip_key'], []).append(entry)
+        for device in devices:
+            self.by_device.setdefault(device, []).append(entry)
+    def core_of(self, group_name):
+        entry = self.by_group.get(group_name)
+        return entry['core'] if entry else None
+    def canonical_chip(self, chip):
+        chip = self.chip_aliases.get(chip, chip)
+        models = self.model_names.get(chip, [])
+        return models[0] if len(models) == 1 else chip
+    def chip_for_device(self, device):
+        chip = self.device_to_chip.get(device)
+        return self.chip_aliases.get(chip, chip) if chip else None
+    def find(self, query):
+        query = query.strip()
+        if query in self.groups:
+            return [query]
+        for index in (self.by_hash, self.by_device):
+            if query in index:
+                return [entry['group_name'] for entry in index[query]]
+        keys = [self.canonical_chip(query)] + self.model_names.get(query, [])
+        chip = self.chip_for_device(query)
+        if chip:
+            keys.append(self.canonical_chip(chip))
+        entries = [entry for key in dict.fromkeys(keys) for entry in self.by_chip.get(key, [])]
+        entries.sort(key=lambda entry: entry['chip'] != query)
+        return list(dict.fromkeys(entry['group_name'] for entry in entries))
@@ -0,0 +1,151 @@
+import sys
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from dvfs_compare import curve_columns
+FIT_DEGREE = 3
+FIT_ITERATIONS = 3
+OUTLIER_THRESHOLD = 3.5
+MAD_SCALE = 1.4826
+MIN_SPREAD_MV = 2.0
+RIDGE = 1e-8
+CHUNK_CURVES = 256
+def pad_curves(curves):
+    columns = [curve_columns(curve) for curve in curves]
+    lengths = np.array([len(freqs) for freqs, _ in columns], dtype=np.int64)
+    width = max(int(lengths.max()) if len(lengths) else 0, 1)
+    mask = np.arange(width)[None, :] < lengths[:, None]
+    freqs = np.zeros((len(columns), width))
+    voltages = np.zeros((len(columns), width))
+    if len(columns):
+        freqs[mask] = np.concatenate([f for f, _ in columns]).astype(float)
+        voltages[mask] = np.concatenate([v for _, v in columns]).astype(float)
+    return freqs, voltages, mask
+def design_matrix(freqs, mask, degree=FIT_DEGREE):
+    has_data = mask.any(axis=1)
+    lo = np.where(has_data, np.where(mask, freqs, np.inf).min(axis=1), 0.0)
+    hi = np.where(has_data, np.where(mask, freqs, -np.inf).max(axis=1), 0.0)
+    center, scale = (lo + hi) / 2, np.maximum((hi - lo) / 2, 1.0)
+    x = (freqs - center[:, None]) / scale[:, None]
+    return x[..., None] ** np.arange(degree + 1), center, scale
+def solve_weighted(design, voltages, weights):
+    weighted = design * weights[..., None]
+    gram = weighted.transpose(0, 2, 1) @ design + RIDGE * np.eye(design.shape[-1])
+    rhs = weighted.transpose(0, 2, 1) @ voltages[..., None]
+    return np.linalg.solve(gram, rhs)[..., 0]
+def robust_scores(residuals, inliers):
+    scores = np.zeros_like(residuals)
+    rows = inliers.any(axis=1)
+    if not rows.any():
+        return scores
+    kept = np.where(inliers[rows], residuals[rows], np.nan)
+    median = np.nanmedian(kept, axis=1, keepdims=True)
+    spread = np.nanmedian(np.abs(kept - median), axis=1, keepdims=True) * MAD_SCALE
+    scores[rows] = np.abs(residuals[rows] - median) / np.maximum(spread, MIN_SPREAD_MV)
+    return scores
+def fit_batch(freqs, voltages, mask, degree=FIT_DEGREE, threshold=OUTLIER_THRESHOLD, iterations=FIT_ITERATIONS):
+    design, center, scale = design_matrix(freqs, mask, degree)
+    inliers = mask.copy()
+    for _ in range(iterations):
+        coefficients = solve_weighted(design, voltages, inliers.astype(float))
+        residuals = np.where(mask, voltages - (design @ coefficients[..., None])[..., 0], 0.0)
+        scores = robust_scores(residuals, inliers)
+        refined = mask & (scores <= threshold)
+        underdetermined = refined.sum(axis=1) <= degree
+        refined[underdetermined] = mask[underdetermined]
+        if np.array_equal(refined, inliers):
+            break
+        inliers = refined
+    return coefficients, center, scale, residuals, np.where(mask, scores, 0.0)
+class CurveFit:
+    def __init__(self, keys, curves, degree=FIT_DEGREE, threshold=OUTLIER_THRESHOLD):
+        self.keys = list(keys)
+        self.degree = degree
+        self.threshold = threshold
+        self.freqs, self.voltages, self.mask = pad_curves(curves)
+        self.lengths = self.mask.sum(axis=1)
+        self.coefficients, self.center, self.scale, self.residuals, self.scores = fit_batch(
+            self.freqs, self.voltages, self.mask, degree, threshold)
+    @classmethod
+    def from_groups(cls, groups, curve_names=None, **kwargs):
+        keys, curves = [], []
+        for group_name, data in groups.items():
+            for curve_name, curve in data.items():
+                if curve_names is not None and curve_name not in curve_names:
+                    continue
+                keys.append((group_name, curve_name))
+                curves.append(curve)
+        return cls(keys, curves, **kwargs)
+    def index(self, group_name, curve_name):
+        return self.keys.index((group_name, curve_name))
+    def point_scores(self, row):
+        return self.scores[row, :self.lengths[row]]
+    def outliers(self, row):
+        return np.flatnonzero(self.point_scores(row) > self.threshold)
+    def predict(self, row, freqs):
+        x = (np.asarray(freqs, dtype=float) - self.center[row]) / self.scale[row]
+        return np.polynomial.polynomial.polyval(x, self.coefficients[row])
+    def report(self):
+        rows = []
+        for row, (group_name, curve_name) in enumerate(self.keys):
+            n = int(self.lengths[row])
+            residuals = self.residuals[row, :n]
+            rows.append({
+                'group_name': group_name, 'curve_name': curve_name, 'points': n,
+                'rms_mv': float(np.sqrt(np.mean(residuals ** 2))) if n else 0.0,
+                'max_score': float(self.point_scores(row).max()) if n else 0.0,
+                'outliers': self.outliers(row).tolist()
+            })
+        return rows
+def _fit_chunk(task):
+    keys, curves, degree, threshold = task
+    return CurveFit(keys, curves, degree, threshold).report()
+def iter_chunks(groups, degree=FIT_DEGREE, threshold=OUTLIER_THRESHOLD, chunk_curves=CHUNK_CURVES):
+    keys, curves = [], []
+    for group_name, data in groups.items():
+        for curve_name, curve in data.items():
+            keys.append((group_name, curve_name))
+            curves.append(tuple(curve_columns(curve)))
+            if len(keys) == chunk_curves:
+                yield keys, curves, degree, threshold
+                keys, curves = [], []
+    if keys:
+        yield keys, curves, degree, threshold
+def fit_groups(groups, workers=None, degree=FIT_DEGREE, threshold=OUTLIER_THRESHOLD, chunk_curves=CHUNK_CURVES):
+    chunks = iter_chunks(groups, degree, threshold, chunk_curves)
+    if workers == 1:
+        for chunk in chunks:
+            yield from _fit_chunk(chunk)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for rows in executor.map(_fit_chunk, chunks):
+            yield from rows
+def main(argv=None):
+    from dvfs_dataset import DvfsDataset
+    parser = argparse.ArgumentParser(description="批量拟合 DVFS 频率-电压曲线并标记异常点。")
+    parser.add_argument('path', help="网站图表数据文件 (JSON)")
+    parser.add_argument('-o', '--output', help="结果输出文件 (JSON Lines)，默认输出到标准输出")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="进程数，默认使用全部 CPU")
+    parser.add_argument('--degree', type=int, default=FIT_DEGREE, help="多项式拟合阶数")
+    parser.add_argument('--threshold', type=float, default=OUTLIER_THRESHOLD, help="异常点的稳健残差分数阈值")
+    parser.add_argument('--all', action='store_true', help="输出全部曲线，而不只是含异常点的曲线")
+    args = parser.parse_args(argv)
+    dataset = DvfsDataset.load(args.path)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    total = flagged = 0
+    try:
+        for error in dataset.errors:
+            out.write(json.dumps({'source': args.path, **error}, ensure_ascii=False, separators=(',', ':')) + '\n')
+        for row in fit_groups(dataset.groups, args.workers, args.degree, args.threshold):
+            total += 1
+            flagged += bool(row['outliers'])
+            if args.all or row['outliers']:
+                out.write(json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"共拟合 {total} 条曲线，{flagged} 条含异常点，{len(dataset.errors)} 个系列无法解析。", file=sys.stderr)
+    return 0
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+from contextlib import contextmanager
+from instrumentation import profiled
+HISTORY_MEMORY_BUDGET = 16 * 1024 * 1024
+DELTA_OVERHEAD_BYTES = 128
+class EditHistory:
+    def __init__(self, stores, memory_budget=HISTORY_MEMORY_BUDGET):
+        self.stores = stores
+        self.memory_budget = memory_budget
+        self.undo_stack = []
+        self.redo_stack = []
+        self.used_bytes = 0
+        self._pending = None
+        self._gesture_depth = 0
+        self._replaying = False
+        for name, store in stores.items():
+            store.subscribe(lambda action, index, old, n=name: self._on_store_changed(n, action, index, old))
+    def can_undo(self):
+        return bool(self.undo_stack)
+    def can_redo(self):
+        return bool(self.redo_stack)
+    def begin_gesture(self):
+        if self._gesture_depth == 0:
+            self._pending = []
+        self._gesture_depth += 1
+    def end_gesture(self):
+        if self._gesture_depth == 0:
+            return
+        self._gesture_depth -= 1
+        if self._gesture_depth == 0:
+            pending, self._pending = self._pending, None
+            if pending:
+                self._push(pending)
+    @contextmanager
+    def gesture(self):
+        self.begin_gesture()
+        try:
+            yield self
+        finally:
+            self.end_gesture()
+    @profiled('history_record')
+    def _on_store_changed(self, name, action, index, old):
+        if self._replaying:
+            return
+        store = self.stores[name]
+        if action == 'move':
+            delta = ['move', name, index, old, store.point(index)]
+        elif action == 'insert':
+            delta = ['insert', name, index, None, store.point(index)]
+        elif action == 'delete':
+            delta = ['delete', name, index, old, None]
+        else:
+            delta = ['reset', name, None, old, store.snapshot()]
+        if self._pending is None:
+            self._push([delta])
+            return
+        last = self._pending[-1] if self._pending else None
+        if last and delta[0] == 'move' and last[0] in ('move', 'insert') and last[1:3] == delta[1:3]:
+            last[4] = delta[4]
+        else:
+            self._pending.append(delta)
+    def _command_bytes(self, command):
+        size = 0
+        for action, _, _, old, new in command:
+            size += DELTA_OVERHEAD_BYTES
+            if action == 'reset':
+                size += sum(column.nbytes for column in old + new)
+        return size
+    @profiled('history_push')
+    def _push(self, command):
+        size = self._command_bytes(command)
+        self.undo_stack.append((command, size))
+        self.used_bytes += size
+        for _, redo_size in self.redo_stack:
+            self.used_bytes -= redo_size
+        self.redo_stack = []
+        while self.used_bytes > self.memory_budget and len(self.undo_stack) > 1:
+            _, dropped = self.undo_stack.pop(0)
+            self.used_bytes -= dropped
+    def _apply(self, command, reverse):
+        self._replaying = True
+        try:
+            for action, name, index, old, new in (reversed(command) if reverse else command):
+                store = self.stores[name]
+                if action == 'move':
+                    store.set_point(index, *(old if reverse else new))
+                elif action == 'insert':
+                    if reverse:
+                        store.delete(index)
+                    else:
+                        store.insert(index, *new)
+                elif action == 'delete':
+                    if reverse:
+                        store.insert(index, *old)
+                    else:
+                        store.delete(index)
+                else:
+                    store.assign(*(old if reverse else new))
+        finally:
+            self._replaying = False
+    def undo(self):
+        if not self.undo_stack or self._pending:
+            return False
+        entry = self.undo_stack.pop()
+        self._apply(entry[0], reverse=True)
+        self.redo_stack.append(entry)
+        return True
+    def redo(self):
+        if not self.redo_stack or self._pending:
+            return False
+        entry = self.redo_stack.pop()
+        self._apply(entry[0], reverse=False)
+        self.undo_stack.append(entry)
+        return True
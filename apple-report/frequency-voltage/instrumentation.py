@@ -0,0 +1,87 @@
+import os
+import csv
+import json
+import time
+import functools
+import threading
+from collections import deque
+import numpy as np
+PROFILE_ENV = 'POINT_EDITOR_PROFILE'
+TRACE_PATH_ENV = 'POINT_EDITOR_TRACE'
+DEFAULT_TRACE_PATH = 'point_editor_trace.json'
+ROLLING_WINDOW = 512
+TRACE_LIMIT = 100000
+HISTOGRAM_EDGES_MS = np.array([0, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33, 66, 133, 250, 500, 1000, np.inf])
+class HotPathStats:
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+        self.recent = deque(maxlen=ROLLING_WINDOW)
+        self.histogram = np.zeros(len(HISTOGRAM_EDGES_MS) - 1, dtype=np.int64)
+    def add(self, ms):
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.last_ms = ms
+        self.recent.append(ms)
+        self.histogram[np.searchsorted(HISTOGRAM_EDGES_MS, ms, side='right') - 1] += 1
+    def summary(self):
+        recent = np.fromiter(self.recent, dtype=float) if self.recent else np.zeros(1)
+        p50, p95, p99 = np.percentile(recent, [50, 95, 99])
+        return {
+            'count': self.count, 'mean_ms': self.total_ms / max(self.count, 1), 'last_ms': self.last_ms,
+            'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99), 'max_ms': self.max_ms,
+            'histogram': {f"<{edge:g}ms": int(n) for edge, n in zip(HISTOGRAM_EDGES_MS[1:], self.histogram)}
+        }
+class Profiler:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stats = {}
+        self.trace = deque(maxlen=TRACE_LIMIT)
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+            self.trace.clear()
+            self._origin = time.perf_counter()
+    def record(self, name, start, end):
+        ms = (end - start) * 1000
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = HotPathStats(name)
+            stats.add(ms)
+            self.trace.append(((start - self._origin) * 1000, name, ms))
+    def summary(self):
+        with self._lock:
+            return {name: stats.summary() for name, stats in self.stats.items()}
+    def export(self, path):
+        with self._lock:
+            trace = list(self.trace)
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['start_ms', 'name', 'duration_ms'])
+                writer.writerows((f"{start:.3f}", name, f"{ms:.3f}") for start, name, ms in trace)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'summary': self.summary(),
+                           'trace': [{'start_ms': start, 'name': name, 'duration_ms': ms} for start, name, ms in trace]}, f)
+PROFILER = Profiler(enabled=os.environ.get(PROFILE_ENV, '') not in ('', '0'))
+def profiled(name):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                PROFILER.record(name, start, time.perf_counter())
+        return wrapper
+    return decorator